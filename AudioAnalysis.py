@@ -0,0 +1,200 @@
+import math
+import multiprocessing
+import os
+import shutil
+import subprocess
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+import numpy as np
+from Song import as_float
+
+ANALYSIS_RATE = 22050
+HOP_SECONDS = 0.01
+CHUNK_SECONDS = 10
+MIN_BPM = 60
+MAX_BPM = 200
+WAV_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+def decode_wav(path, chunk_seconds=CHUNK_SECONDS):
+    with wave.open(path, "rb") as f:
+        rate = f.getframerate()
+        channels = f.getnchannels()
+        width = f.getsampwidth()
+        yield rate, f.getnframes() / rate
+        chunk = int(rate * chunk_seconds)
+        while True:
+            data = f.readframes(chunk)
+            if not data:
+                break
+            if width == 3:
+                raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+                samples = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8)
+                           | (raw[:, 2].astype(np.int8).astype(np.int32) << 16)).astype(np.float32)
+                scale = float(1 << 23)
+            else:
+                samples = np.frombuffer(data, dtype=WAV_DTYPES[width]).astype(np.float32)
+                if width == 1:
+                    samples -= 128
+                scale = float(1 << (8 * width - 1))
+            yield samples.reshape(-1, channels).mean(axis=1) / scale
+
+
+def decode_ffmpeg(path, chunk_seconds=CHUNK_SECONDS, rate=ANALYSIS_RATE):
+    command = ["ffmpeg", "-v", "error", "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(rate), "-"]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        yield rate, None
+        chunk = int(rate * chunk_seconds) * 2
+        while True:
+            data = process.stdout.read(chunk)
+            if not data:
+                break
+            yield np.frombuffer(data[:len(data) // 2 * 2], dtype=np.int16).astype(np.float32) / 32768
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+def decode_chunks(path, chunk_seconds=CHUNK_SECONDS):
+    if path.lower().endswith(".wav"):
+        return decode_wav(path, chunk_seconds)
+    if shutil.which("ffmpeg"):
+        return decode_ffmpeg(path, chunk_seconds)
+    raise ValueError(f"No decoder available for {os.path.basename(path)}")
+
+
+class OnsetEnvelope():
+    def __init__(self, rate, hop_seconds=HOP_SECONDS):
+        self.rate = rate
+        self.hop = max(1, int(round(rate * hop_seconds)))
+        self.size = 1 << math.ceil(math.log2(self.hop * 4))
+        self.window = np.hanning(self.size).astype(np.float32)
+        self.tail = np.zeros(0, dtype=np.float32)
+        self.previous = None
+        self.parts = []
+
+    @property
+    def fps(self):
+        return self.rate / self.hop
+
+    def feed(self, samples):
+        buffer = np.concatenate((self.tail, samples))
+        if len(buffer) < self.size:
+            self.tail = buffer
+            return
+        count = (len(buffer) - self.size) // self.hop + 1
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, self.size)[::self.hop][:count]
+        spectrum = np.log1p(100 * np.abs(np.fft.rfft(frames * self.window, axis=1)))
+        if self.previous is not None:
+            spectrum = np.vstack((self.previous, spectrum))
+        self.parts.append(np.maximum(np.diff(spectrum, axis=0), 0).sum(axis=1))
+        self.previous = spectrum[-1:]
+        self.tail = buffer[count * self.hop:]
+
+    def envelope(self):
+        if not self.parts:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(self.parts)
+
+
+def estimate_tempo(envelope, fps, low=MIN_BPM, high=MAX_BPM):
+    n = len(envelope)
+    if n < fps * 4:
+        return 0.0
+    signal = envelope - envelope.mean()
+    size = 1 << (2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(signal, size)
+    correlation = np.fft.irfft(spectrum * np.conj(spectrum), size)[:n]
+    if correlation[0] <= 0:
+        return 0.0
+    correlation /= correlation[0]
+    lags = np.arange(max(1, int(fps * 60 / high)), min(n - 2, int(math.ceil(fps * 60 / low))) + 1)
+    if not len(lags):
+        return 0.0
+    prior = np.exp(-0.5 * np.log2(60 * fps / lags / 120) ** 2)
+    best = int(lags[np.argmax(correlation[lags] * prior)])
+    left, centre, right = correlation[best - 1], correlation[best], correlation[best + 1]
+    curvature = left - 2 * centre + right
+    offset = 0.5 * (left - right) / curvature if curvature < 0 else 0.0
+    return 60 * fps / (best + offset)
+
+
+def analyze_file(path, max_seconds=120):
+    try:
+        chunks = decode_chunks(path)
+        rate, duration = next(chunks)
+        onsets = OnsetEnvelope(rate)
+        samples = 0
+        limit = int(rate * max_seconds)
+        for chunk in chunks:
+            if samples < limit:
+                onsets.feed(chunk[:limit - samples])
+            samples += len(chunk)
+            if duration is not None and samples >= limit:
+                break
+        if duration is None:
+            duration = samples / rate
+        bpm = estimate_tempo(onsets.envelope(), onsets.fps)
+    except Exception as e:
+        return {"error": f"Local analysis failed: {e}", "file_path": path}
+    return {"status": "success", "file_path": path, "bpm": round(float(bpm), 2), "duration": round(float(duration), 2)}
+
+
+@dataclass
+class AnalysisReport:
+    analysed: list[tuple[str, float, float]] = field(default_factory=list)
+    failures: list[tuple[str, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        total = len(self.analysed) + len(self.failures)
+        return total / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (f"Analysed {len(self.analysed)} songs, {len(self.failures)} failed "
+                f"in {self.elapsed:.1f}s ({self.throughput:.1f} tracks/s)")
+
+
+class LocalAnalyzer():
+    def __init__(self, max_workers=None, max_seconds=120):
+        self.max_seconds = max_seconds
+        self.pool = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                        mp_context=multiprocessing.get_context("spawn"))
+
+    def analyze_audio(self, file):
+        return self.pool.submit(analyze_file, file, self.max_seconds).result()
+
+    def analyze_audio_batch(self, files):
+        return list(self.pool.map(analyze_file, files, repeat(self.max_seconds)))
+
+    def analyze_library(self, storage, batch_size=64, missing_only=True, progress=None) -> AnalysisReport:
+        paths = [row['file_path'] for row in storage.iter_rows()
+                 if not missing_only or not as_float(row['bpm']) or not as_float(row['duration'])]
+        report = AnalysisReport()
+        pending = []
+        start = time.perf_counter()
+        results = self.pool.map(analyze_file, paths, repeat(self.max_seconds), chunksize=4)
+        for done, (path, result) in enumerate(zip(paths, results), 1):
+            if "error" in result:
+                report.failures.append((path, result["error"]))
+            else:
+                pending.append((path, result["duration"], result["bpm"]))
+            if len(pending) >= batch_size:
+                storage.update_analysis(pending)
+                report.analysed.extend(pending)
+                pending = []
+            if progress:
+                progress(done, len(paths), path)
+        if pending:
+            storage.update_analysis(pending)
+            report.analysed.extend(pending)
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
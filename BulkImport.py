@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from Song import Song
+from Importer import Importer, DuplicateSong
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.flac', '.ogg')
+
+
+@dataclass
+class ImportReport:
+    imported: list[Song] = field(default_factory=list)
+    failures: list[tuple[str, str]] = field(default_factory=list)
+    duplicates: list[tuple[str, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        total = len(self.imported) + len(self.failures) + len(self.duplicates)
+        return total / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (f"Imported {len(self.imported)} songs, {len(self.duplicates)} duplicates skipped, "
+                f"{len(self.failures)} failed in {self.elapsed:.1f}s ({self.throughput:.1f} files/s)")
+
+
+class ThrottledServices():
+    def __init__(self, services, limit=4):
+        self.services = services
+        self.song_slots = threading.BoundedSemaphore(limit)
+        self.audio_slots = threading.BoundedSemaphore(limit)
+        self.cover_slots = threading.BoundedSemaphore(limit)
+        self.batches = ThreadPoolExecutor(max_workers=limit, thread_name_prefix="analysis-batch")
+        self.prefetched = {}
+
+    def prefetch_analysis(self, paths, batch_size=32):
+        if not hasattr(self.services, "analyze_audio_batch"):
+            return
+        for start in range(0, len(paths), batch_size):
+            chunk = paths[start:start + batch_size]
+            future = self.batches.submit(self._analyze_chunk, chunk)
+            for position, path in enumerate(chunk):
+                self.prefetched[path] = (future, position)
+
+    def _analyze_chunk(self, chunk):
+        with self.audio_slots:
+            return self.services.analyze_audio_batch(chunk)
+
+    def get_song_info(self, song_name, artist_name):
+        with self.song_slots:
+            return self.services.get_song_info(song_name, artist_name)
+
+    def analyze_audio(self, file):
+        entry = self.prefetched.pop(file, None)
+        if entry:
+            future, position = entry
+            try:
+                return future.result()[position]
+            except Exception as e:
+                return {"error": f"Batch analysis failed: {e}"}
+        with self.audio_slots:
+            return self.services.analyze_audio(file)
+
+    def process_cover(self, url, size=200):
+        with self.cover_slots:
+            return self.services.process_cover(url, size)
+
+    def __getattr__(self, name):
+        return getattr(self.services, name)
+
+
+def find_audio_files(root):
+    found = []
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                found.append(os.path.join(directory, name))
+    return found
+
+
+def guess_title_artist(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    if " - " in name:
+        artist, title = name.split(" - ", 1)
+        return title.strip(), artist.strip()
+    return name.strip(), ""
+
+
+class BulkImporter():
+    def __init__(self, services, storage=None, dest_dir="data/songs", covers_dir="data/covers",
+                 max_workers=8, service_limit=4, batch_size=32, analyzer=None, known=None):
+        self.storage = storage
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.services = ThrottledServices(services, service_limit)
+        self.importer = Importer(self.services, dest_dir, covers_dir, max_workers, analyzer, known)
+
+    def run(self, paths, progress=None) -> ImportReport:
+        if isinstance(paths, str):
+            paths = find_audio_files(paths)
+        report = ImportReport()
+        total = len(paths)
+        in_flight = threading.BoundedSemaphore(self.max_workers * 2)
+        lock = threading.Lock()
+        done = threading.Event()
+        finished = [0]
+        stored = set()
+        start = time.perf_counter()
+        self.services.prefetch_analysis(paths, self.batch_size)
+
+        def on_done(path, future):
+            try:
+                song = future.result()
+                with lock:
+                    if song.file_path in stored:
+                        report.duplicates.append((path, song.file_path))
+                    else:
+                        stored.add(song.file_path)
+                        report.imported.append(song)
+            except DuplicateSong as e:
+                with lock:
+                    report.duplicates.append((path, e.existing))
+            except Exception as e:
+                with lock:
+                    report.failures.append((path, str(e)))
+            in_flight.release()
+            with lock:
+                finished[0] += 1
+                count = finished[0]
+            if progress:
+                progress(count, total, path)
+            if count == total:
+                done.set()
+
+        for path in paths:
+            in_flight.acquire()
+            title, artist = guess_title_artist(path)
+            future = self.importer.import_file(path, title, artist)
+            future.add_done_callback(lambda f, path=path: on_done(path, f))
+        if total:
+            done.wait()
+        report.elapsed = time.perf_counter() - start
+
+        if self.storage and report.imported:
+            self.storage.add_songs(report.imported)
+        return report
+
+    def shutdown(self):
+        self.importer.shutdown()
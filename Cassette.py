@@ -1,51 +1,191 @@
-from dataclasses import dataclass
+from collections import OrderedDict
+from itertools import islice
+from dataclasses import dataclass, field
 from typing import Optional
 import os
 from Song import Song
+from SongCatalog import CatalogListener
 
-@dataclass
-class Cassette:
+@dataclass(eq=False)
+class Cassette(CatalogListener):
     name: str
-    songs: list[Song]  
+    songs: OrderedDict[str, Song]
     notes: dict[str, str] = None
-    cover: str = "assets/placeholder_conver.png"
-    
+    cover: str = "assets/placeholder_cover.png"
+    total: float = field(default=0.0, init=False)
+    catalog: object = field(default=None, init=False, repr=False)
+
     def __post_init__(self):
       if self.notes is None:
           self.notes = {}
+      songs = self.songs.values() if isinstance(self.songs, dict) else self.songs
+      self.songs = OrderedDict((song.file_path, song) for song in songs)
+      self.total = sum(song.duration for song in self.songs.values())
+
+    def __len__(self):
+        return len(self.songs)
+
+    def __iter__(self):
+        return iter(self.songs.values())
+
+    def __contains__(self, song):
+        return (song.file_path if isinstance(song, Song) else song) in self.songs
+
+    @property
+    def track_count(self):
+        return len(self.songs)
 
     def add_song(self, song: Song, note: str = ""):
-        if song not in self.songs:
-            self.songs.append(song)
+        if song.file_path not in self.songs:
+            self.songs[song.file_path] = song
+            self.total += song.duration
             if note:
                 self.notes[song.file_path] = note
-    
+
     def remove_song(self, song: Song):
-        if song in self.songs:
-            self.songs.remove(song)
-            self.notes.pop(song.file_path, None)
-    
+        removed = self.songs.pop(song.file_path if isinstance(song, Song) else song, None)
+        if removed is not None:
+            self.total -= removed.duration
+            self.notes.pop(removed.file_path, None)
+        return removed
+
+    def move_to_end(self, song, last=True):
+        self.songs.move_to_end(song.file_path if isinstance(song, Song) else song, last)
+
+    def move(self, song, position):
+        key = song.file_path if isinstance(song, Song) else song
+        if key not in self.songs:
+            raise KeyError(key)
+        self.songs.move_to_end(key)
+        for after in list(islice(self.songs, max(0, position), len(self.songs) - 1)):
+            self.songs.move_to_end(after)
+
+    def reorder(self, keys):
+        keys = [key.file_path if isinstance(key, Song) else key for key in keys]
+        if set(keys) != self.songs.keys() or len(keys) != len(self.songs):
+            raise ValueError("Reorder must list every song in the cassette exactly once")
+        self.songs = OrderedDict((key, self.songs[key]) for key in keys)
+
     def get_note(self, song: Song) -> str:
         return self.notes.get(song.file_path, "")
-    
+
     def set_note(self, song: Song, note: str):
         self.notes[song.file_path] = note
-    
+
     def total_duration(self):
-        return sum(song.duration for song in self.songs)
-    
+        return self.total
+
+    def attach(self, catalog):
+        if self.catalog is not None:
+            self.catalog.remove_listener(self)
+        self.catalog = catalog
+        if catalog is not None and hasattr(catalog, "add_listener"):
+            catalog.add_listener(self)
+
+    def detach(self):
+        self.attach(None)
+
+    def begin_remove(self, position):
+        self.remove_song(self.catalog[position].file_path)
+
+    def row_changed(self, position):
+        song = self.catalog[position]
+        current = self.songs.get(song.file_path)
+        if current is not None:
+            self.total += song.duration - current.duration
+            self.songs[song.file_path] = song
+
     def to_dict(self) -> dict:
           return {
               'name': self.name,
-              'songs': self.songs,
+              'songs': list(self.songs),
               'notes': self.notes,
-              'cover_path': self.cover_path
+              'cover': self.cover
           }
-    
+
     @classmethod
-    def from_dict(cls, data: dict) -> 'Song':
-      return cls(
+    def from_dict(cls, data: dict, catalog) -> 'Cassette':
+      if data.get('query') and cls is Cassette:
+          return SmartCassette.from_dict(data, catalog)
+      songs = []
+      for key in data.get('songs', []):
+          song = catalog.get(key['file_path'] if isinstance(key, dict) else key)
+          if song is not None:
+              songs.append(song)
+      present = {song.file_path for song in songs}
+      cassette = cls(
           name=data['name'],
-          songs=data['songs'],
-          notes=data['notes']
-      )
\ No newline at end of file
+          songs=songs,
+          notes={k: v for k, v in data.get('notes', {}).items() if k in present},
+          cover=data.get('cover') or data.get('cover_path') or "assets/placeholder_cover.png"
+      )
+      return cassette
+
+
+@dataclass(eq=False)
+class SmartCassette(Cassette):
+    query: str = ""
+    expression: object = field(default=None, init=False, repr=False)
+    inserting: int = field(default=-1, init=False, repr=False)
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.set_query(self.query)
+
+    def set_query(self, query):
+        from QueryEngine import parse
+        expression, text = parse(query)
+        if expression is None or text:
+            raise ValueError(f"Smart cassette query must only use bpm, duration and genre filters: {query!r}")
+        self.query = query
+        self.expression = expression
+        self.refresh()
+
+    def refresh(self, catalog=None):
+        catalog = catalog or self.catalog
+        if catalog is None:
+            return
+        songs = catalog.select(self.expression)
+        self.songs = OrderedDict((song.file_path, song) for song in songs)
+        self.total = sum(song.duration for song in songs)
+        self.notes = {key: note for key, note in self.notes.items() if key in self.songs}
+
+    def attach(self, catalog):
+        super().attach(catalog)
+        self.refresh()
+
+    def begin_insert(self, position):
+        self.inserting = position
+
+    def end_insert(self):
+        song = self.catalog[self.inserting]
+        if self.expression.match(song):
+            self.add_song(song)
+
+    def row_changed(self, position):
+        song = self.catalog[position]
+        matches = self.expression.match(song)
+        if song.file_path in self.songs:
+            if matches:
+                super().row_changed(position)
+            else:
+                self.remove_song(song)
+        elif matches:
+            self.add_song(song)
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data['query'] = self.query
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict, catalog) -> 'SmartCassette':
+        cassette = cls(
+            name=data['name'],
+            songs=[],
+            notes=data.get('notes', {}),
+            cover=data.get('cover') or "assets/placeholder_cover.png",
+            query=data['query']
+        )
+        cassette.refresh(catalog)
+        return cassette
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+import re
+from Cassette import Cassette
+
+UNSAFE = re.compile(r'[^A-Za-z0-9_-]+')
+
+
+class CassetteStore():
+    def __init__(self, cassettes_dir="data/cassettes"):
+        self.cassettes_dir = cassettes_dir
+        os.makedirs(cassettes_dir, exist_ok=True)
+
+    def path(self, name):
+        slug = UNSAFE.sub("-", name).strip("-")[:48] or "cassette"
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.cassettes_dir, f"{slug}-{digest}.json")
+
+    def save(self, cassette: Cassette):
+        path = self.path(cassette.name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cassette.to_dict(), f, indent=4)
+        os.replace(tmp_path, path)
+        return path
+
+    def delete(self, name):
+        try:
+            os.remove(self.path(name))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def rename(self, cassette: Cassette, new_name):
+        old_name = cassette.name
+        cassette.name = new_name
+        self.save(cassette)
+        if self.path(old_name) != self.path(new_name):
+            self.delete(old_name)
+
+    def iter_data(self):
+        for entry in os.scandir(self.cassettes_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path) as f:
+                    yield json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"Skipping cassette {entry.name}: {e}")
+
+    def load(self, name, catalog):
+        try:
+            with open(self.path(name)) as f:
+                return Cassette.from_dict(json.load(f), catalog)
+        except FileNotFoundError:
+            return None
+
+    def index(self, catalog):
+        headers = {}
+        for data in self.iter_data():
+            keys = (key['file_path'] if isinstance(key, dict) else key for key in data.get('songs', []))
+            data['songs'] = [key for key in keys if key in catalog]
+            headers[data['name']] = data
+        return headers
+
+    def resolve(self, data, catalog):
+        return Cassette.from_dict(data, catalog)
+
+    def load_all(self, catalog):
+        cassettes = [Cassette.from_dict(data, catalog) for data in self.iter_data()]
+        return {cassette.name: cassette for cassette in sorted(cassettes, key=lambda c: c.name.lower())}
@@ -0,0 +1,201 @@
+import mmap
+import os
+import struct
+from array import array
+from Song import Song
+from SongTable import SongTable, Vocabulary, CODED_COLUMNS, STRING_COLUMNS, FLOAT_COLUMNS
+
+MAGIC = b"CSNP"
+VERSION = 2
+HEADER = struct.Struct("<4sHHIqq")
+HEADER_SIZE = 32
+SECTION = struct.Struct("<QQ")
+
+SECTIONS = ([('float', name) for name in FLOAT_COLUMNS] +
+            [('code', name) for name in CODED_COLUMNS] +
+            [('vocab', name) for name in CODED_COLUMNS] +
+            [('string', name) for name in STRING_COLUMNS])
+
+
+def source_stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _string_sections(values):
+    encoded = [(value or "").encode("utf-8") + b"\0" for value in values]
+    offsets = array('Q', [0])
+    total = 0
+    for value in encoded:
+        total += len(value)
+        offsets.append(total)
+    return [offsets.tobytes(), b"".join(encoded)]
+
+
+def write_table(path, table: SongTable, stamp=(0, 0)):
+    sections = []
+    for kind, name in SECTIONS:
+        if kind == 'float':
+            sections.append(getattr(table, name).tobytes())
+        elif kind == 'code':
+            sections.append(table.codes[name].tobytes())
+        elif kind == 'vocab':
+            sections.extend(_string_sections(table.vocab[name].values))
+        else:
+            sections.extend(_string_sections(getattr(table, name)))
+
+    directory_size = SECTION.size * len(sections)
+    position = HEADER_SIZE + directory_size
+    directory = []
+    for data in sections:
+        directory.append(SECTION.pack(position, len(data)))
+        position += len(data) + (-len(data) % 8)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(table), stamp[0], stamp[1]).ljust(HEADER_SIZE, b"\0"))
+        f.write(b"".join(directory))
+        for data in sections:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    os.replace(tmp_path, path)
+    return len(table)
+
+
+def write_snapshot(path, rows, stamp=(0, 0)):
+    return write_table(path, SongTable.from_rows(rows), stamp)
+
+
+class SnapshotReader():
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty snapshot: {path}")
+        magic, version, _, count, mtime_ns, size = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot: {path}")
+        self.count = count
+        self.stamp = (mtime_ns, size)
+
+        self._views = [memoryview(self._map)]
+        sections = []
+        position = HEADER_SIZE
+        section_count = sum(1 if kind in ('float', 'code') else 2 for kind, _ in SECTIONS)
+        for _ in range(section_count):
+            start, length = SECTION.unpack_from(self._map, position)
+            sections.append(self._view(self._views[0][start:start + length]))
+            position += SECTION.size
+
+        self.floats = {}
+        self.codes = {}
+        self.vocab = {}
+        self.strings = {}
+        for kind, name in SECTIONS:
+            if kind == 'float':
+                self.floats[name] = self._view(sections.pop(0).cast('d'))
+            elif kind == 'code':
+                self.codes[name] = self._view(sections.pop(0).cast('I'))
+            else:
+                offsets = self._view(sections.pop(0).cast('Q'))
+                blob = sections.pop(0)
+                if kind == 'vocab':
+                    self.vocab[name] = self._split(blob)
+                else:
+                    self.strings[name] = (offsets, blob)
+
+    def _view(self, view):
+        self._views.append(view)
+        return view
+
+    def _split(self, blob):
+        return str(blob, "utf-8").split("\0")[:-1]
+
+    def __len__(self):
+        return self.count
+
+    def string(self, name, index):
+        if name in self.codes:
+            return self.vocab[name][self.codes[name][index]]
+        offsets, blob = self.strings[name]
+        return str(blob[offsets[index]:offsets[index + 1] - 1], "utf-8")
+
+    def column(self, name):
+        if name in self.floats:
+            return self.floats[name].tolist()
+        if name in self.codes:
+            values = self.vocab[name]
+            return [values[code] for code in self.codes[name]]
+        _, blob = self.strings[name]
+        return self._split(blob)
+
+    def row(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        data = {name: self.string(name, index) for name in STRING_COLUMNS + CODED_COLUMNS}
+        for name in FLOAT_COLUMNS:
+            data[name] = self.floats[name][index]
+        data['cover_url'] = data['cover_url'] or None
+        data['cover_path'] = data['cover_path'] or "assets/placeholder_cover.png"
+        return data
+
+    def song(self, index):
+        return Song.from_dict(self.row(index))
+
+    def songs(self):
+        columns = [self.column(name) for name in
+                   ['file_path', 'title', 'artist', 'album', 'genre', 'duration',
+                    'cover_url', 'cover_path', 'bpm']]
+        return [Song(fp, title, artist, album, genre, duration,
+                     cover_url or None, cover_path or "assets/placeholder_cover.png", bpm)
+                for fp, title, artist, album, genre, duration, cover_url, cover_path, bpm
+                in zip(*columns)]
+
+    def to_table(self) -> SongTable:
+        table = SongTable()
+        for name in FLOAT_COLUMNS:
+            column = array('d')
+            column.frombytes(self.floats[name].cast('B'))
+            setattr(table, name, column)
+        for name in CODED_COLUMNS:
+            table.codes[name].frombytes(self.codes[name].cast('B'))
+            table.vocab[name] = Vocabulary(self.vocab[name])
+        table.file_path = self.column('file_path')
+        table.title = self.column('title')
+        table.cover_url = [value or None for value in self.column('cover_url')]
+        table.cover_path = [value or "assets/placeholder_cover.png" for value in self.column('cover_path')]
+        return table
+
+    def iter_rows(self):
+        for index in range(self.count):
+            yield self.row(index)
+
+    def close(self):
+        self.floats = {}
+        self.codes = {}
+        self.strings = {}
+        for view in reversed(getattr(self, '_views', [])):
+            view.release()
+        self._views = []
+        self._map.close()
+        self._file.close()
+
+
+def open_snapshot(path, stamp=None):
+    try:
+        reader = SnapshotReader(path)
+    except (FileNotFoundError, ValueError, struct.error):
+        return None
+    if stamp is not None and reader.stamp != tuple(stamp):
+        reader.close()
+        return None
+    return reader
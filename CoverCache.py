@@ -0,0 +1,129 @@
+import hashlib
+import os
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+PLACEHOLDER = "assets/placeholder_cover.png"
+LIST_SIZE = 32
+PLAYER_SIZE = 200
+
+
+class ThumbnailSignals(QObject):
+    finished = pyqtSignal(str, int, str)
+
+
+class ThumbnailJob(QRunnable):
+    def __init__(self, source, size, thumb_path, signals):
+        super().__init__()
+        self.source = source
+        self.size = size
+        self.thumb_path = thumb_path
+        self.signals = signals
+
+    def run(self):
+        image = QImage(self.source)
+        if image.isNull():
+            self.signals.finished.emit(self.source, self.size, "")
+            return
+        image = image.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        tmp_path = self.thumb_path + ".tmp.png"
+        if image.save(tmp_path, "PNG"):
+            os.replace(tmp_path, self.thumb_path)
+            self.signals.finished.emit(self.source, self.size, self.thumb_path)
+        else:
+            self.signals.finished.emit(self.source, self.size, "")
+
+
+class CoverCache(QObject):
+    ready = pyqtSignal(str, int)
+
+    def __init__(self, thumb_dir="data/covers/thumbs", budget_bytes=32 * 1024 * 1024):
+        super().__init__()
+        self.thumb_dir = thumb_dir
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self._pixmaps = OrderedDict()
+        self._pending = set()
+        self._failed = set()
+        os.makedirs(thumb_dir, exist_ok=True)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(2)
+        self.signals = ThumbnailSignals()
+        self.signals.finished.connect(self._on_thumbnail)
+
+    def _mtime(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except (FileNotFoundError, TypeError):
+            return None
+
+    def thumb_path(self, source, size):
+        digest = hashlib.sha1(os.path.abspath(source).encode("utf-8")).hexdigest()
+        return os.path.join(self.thumb_dir, f"{digest}_{size}.png")
+
+    def _store(self, key, pixmap):
+        old = self._pixmaps.pop(key, None)
+        if old is not None:
+            self.used_bytes -= self._cost(old)
+        self._pixmaps[key] = pixmap
+        self.used_bytes += self._cost(pixmap)
+        while self.used_bytes > self.budget_bytes and len(self._pixmaps) > 1:
+            _, evicted = self._pixmaps.popitem(last=False)
+            self.used_bytes -= self._cost(evicted)
+
+    def _cost(self, pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def placeholder(self, size):
+        key = (PLACEHOLDER, self._mtime(PLACEHOLDER), size)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(PLACEHOLDER)
+            if not pixmap.isNull():
+                pixmap = pixmap.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self._store(key, pixmap)
+        return pixmap
+
+    def pixmap(self, source, size):
+        mtime = self._mtime(source)
+        if mtime is None or source == PLACEHOLDER:
+            return self.placeholder(size)
+        key = (source, mtime, size)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        if key in self._failed:
+            return self.placeholder(size)
+
+        thumb_path = self.thumb_path(source, size)
+        thumb_mtime = self._mtime(thumb_path)
+        if thumb_mtime is not None and thumb_mtime >= mtime:
+            pixmap = QPixmap(thumb_path)
+            if not pixmap.isNull():
+                self._store(key, pixmap)
+                return pixmap
+
+        if key not in self._pending:
+            self._pending.add(key)
+            self.pool.start(ThumbnailJob(source, size, thumb_path, self.signals))
+        return self.placeholder(size)
+
+    def _on_thumbnail(self, source, size, thumb_path):
+        for key in [k for k in self._pending if k[0] == source and k[2] == size]:
+            self._pending.discard(key)
+            if not thumb_path:
+                self._failed.add(key)
+                continue
+            pixmap = QPixmap(thumb_path)
+            if pixmap.isNull():
+                self._failed.add(key)
+                continue
+            self._store(key, pixmap)
+        self.ready.emit(source, size)
+
+    def invalidate(self, source):
+        for key in [k for k in self._pixmaps if k[0] == source]:
+            self.used_bytes -= self._cost(self._pixmaps.pop(key))
+        self._failed = {k for k in self._failed if k[0] != source}
@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from Song import Song, as_float
+from SongStore import SongStore
+from Metrics import span
+
+
+class DuplicateSong(Exception):
+    def __init__(self, source, existing):
+        super().__init__(f"Already in library: {source} -> {existing}")
+        self.source = source
+        self.existing = existing
+
+
+class Importer():
+    def __init__(self, services, dest_dir="data/songs", covers_dir="data/covers", max_workers=4,
+                 analyzer=None, known=None):
+        self.services = services
+        self.analyzer = analyzer
+        self.known = known
+        self.dest_dir = dest_dir
+        self.store = SongStore(dest_dir)
+        self.covers_dir = covers_dir
+        self.stages = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="import-stage")
+        self.jobs = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="import-job")
+
+    def copy_file(self, source):
+        dest, copied = self.store.put(source)
+        if not copied and self.known and self.known(dest):
+            raise DuplicateSong(source, dest)
+        return dest
+
+    def lookup(self, title, artist):
+        return self.services.get_song_info(title, artist)
+
+    def analyze(self, source):
+        result = self.services.analyze_audio(source)
+        if "error" in result and self.analyzer:
+            print(f"Audio analysis failed: {result['error']}, analysing locally")
+            return self.analyzer.analyze_audio(source)
+        return result
+
+    def fetch_cover(self, song):
+        if not song.cover_url:
+            return song
+        os.makedirs(self.covers_dir, exist_ok=True)
+        result = self.services.process_cover(song.cover_url, 200)
+        if "error" in result:
+            print(f"Cover processing failed: {result['error']}")
+            return song
+        cover_path = f"{self.covers_dir}/{song.title}_{song.artist}.jpeg"
+        with open(cover_path, "wb") as f:
+            f.write(result["image_data"])
+        song.cover_path = cover_path
+        return song
+
+    def build_song(self, dest_path, title, artist, info):
+        if info and "error" not in info:
+            return Song.from_microservice_data(dest_path, info)
+        if info:
+            print(f"Error: {info['error']}")
+        return Song(dest_path, title, artist)
+
+    def _stage(self, progress, source, stage, fn, *args):
+        def run():
+            progress(source, stage, "started")
+            try:
+                with span(f"import.{stage}"):
+                    result = fn(*args)
+            except Exception:
+                progress(source, stage, "failed")
+                raise
+            progress(source, stage, "done")
+            return result
+        return self.stages.submit(run)
+
+    def run_import(self, source, title="", artist="", progress=None):
+        progress = progress or (lambda source, stage, status: None)
+        copied = self._stage(progress, source, "copy", self.copy_file, source)
+        analysed = self._stage(progress, source, "analysis", self.analyze, source)
+        progress(source, "metadata", "started")
+        with span("import.metadata"):
+            info = self.lookup(title, artist)
+        progress(source, "metadata", "failed" if "error" in info else "done")
+        song = self.build_song(f"{self.dest_dir}/{os.path.basename(source)}", title, artist, info)
+        covered = self._stage(progress, source, "cover", self.fetch_cover, song)
+
+        song.file_path = copied.result()
+        covered.result()
+        analysis = analysed.result()
+        if "error" in analysis:
+            print(f"Audio analysis failed: {analysis['error']}")
+        else:
+            song.bpm = as_float(analysis["bpm"])
+            song.duration = as_float(analysis["duration"])
+        progress(source, "import", "done")
+        return song
+
+    def timed_import(self, source, title, artist, progress):
+        with span("import.total"):
+            return self.run_import(source, title, artist, progress)
+
+    def import_file(self, source, title="", artist="", progress=None):
+        return self.jobs.submit(self.timed_import, source, title, artist, progress)
+
+    def shutdown(self):
+        self.jobs.shutdown(wait=False)
+        self.stages.shutdown(wait=False)
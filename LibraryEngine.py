@@ -0,0 +1,192 @@
+import dataclasses
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from Song import Song
+from Storage import Storage
+from SongStore import SongStore
+from Metrics import span
+
+
+class LibraryEngine():
+    def __init__(self, storage=None, services=None, data_dir="data", engine="sqlite", workers=8):
+        self.storage = storage or Storage(engine=engine, data_dir=data_dir)
+        self.data_dir = self.storage.data_dir
+        self.workers = workers
+        self._services = services
+        self._catalog = None
+
+    @property
+    def catalog(self):
+        if self._catalog is None:
+            self._catalog = self.storage.open_catalog()
+        return self._catalog
+
+    @property
+    def services(self):
+        if self._services is None:
+            from Microservices import Microservices
+            from ResponseCache import ResponseCache, CachedServices
+            self._services = CachedServices(Microservices(),
+                                            ResponseCache(os.path.join(self.data_dir, "cache.db")))
+        return self._services
+
+    def _apply(self, songs):
+        if self._catalog is None:
+            return
+        for song in songs:
+            self._catalog.append(song)
+
+    def add_song(self, song: Song):
+        self.add_songs([song])
+
+    def add_songs(self, songs):
+        songs = list(songs)
+        if not songs:
+            return
+        with span("library.add_songs", count=len(songs)):
+            self.storage.add_songs(songs)
+            self._apply(songs)
+
+    def update_song(self, file_path, song: Song):
+        self.storage.replace_song(file_path, song)
+        if self._catalog is not None:
+            self._catalog.replace(file_path, song)
+
+    def remove_song(self, song: Song):
+        self.storage.remove_song(song)
+        if self._catalog is not None:
+            self._catalog.remove(song.file_path)
+
+    def import_paths(self, paths, progress=None):
+        from BulkImport import BulkImporter
+        from AudioAnalysis import LocalAnalyzer
+        analyzer = LocalAnalyzer(max_workers=self.workers)
+        importer = BulkImporter(self.services, None, os.path.join(self.data_dir, "songs"),
+                                os.path.join(self.data_dir, "covers"), max_workers=self.workers,
+                                analyzer=analyzer, known=self.catalog.__contains__)
+        try:
+            with span("library.import"):
+                report = importer.run(paths, progress)
+            self.add_songs(report.imported)
+        finally:
+            importer.shutdown()
+            analyzer.shutdown()
+        return report
+
+    def reanalyze(self, missing_only=True, progress=None):
+        from AudioAnalysis import LocalAnalyzer
+        analyzer = LocalAnalyzer(max_workers=self.workers)
+        try:
+            with span("library.reanalyze"):
+                report = analyzer.analyze_library(self.storage, missing_only=missing_only, progress=progress)
+        finally:
+            analyzer.shutdown()
+        if self._catalog is not None:
+            for file_path, duration, bpm in report.analysed:
+                song = self._catalog.get(file_path)
+                if song is not None:
+                    self._catalog.replace(file_path, dataclasses.replace(song, duration=duration, bpm=bpm))
+        return report
+
+    def needs_cover(self, row, force):
+        if not row.get('cover_url'):
+            return False
+        cover_path = row.get('cover_path')
+        return force or not cover_path or cover_path == "assets/placeholder_cover.png" \
+            or not os.path.exists(cover_path)
+
+    def refetch_covers(self, force=False, progress=None, batch_size=256):
+        from Importer import Importer
+        from BulkImport import ImportReport
+        importer = Importer(self.services, covers_dir=os.path.join(self.data_dir, "covers"),
+                            max_workers=1)
+
+        def refetch(song):
+            if force:
+                self.services.invalidate_cover(song.cover_url)
+            return importer.fetch_cover(song)
+
+        songs = [Song.from_dict(row) for row in self.storage.iter_rows() if self.needs_cover(row, force)]
+        report = ImportReport()
+        pending = []
+        start = time.perf_counter()
+        with span("library.refetch_covers"), ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(refetch, dataclasses.replace(song, cover_path=None)): song for song in songs}
+            for done, future in enumerate(as_completed(futures), 1):
+                song = futures[future]
+                try:
+                    updated = future.result()
+                except Exception as e:
+                    report.failures.append((song.file_path, str(e)))
+                else:
+                    if updated.cover_path is not None:
+                        pending.append(updated)
+                        report.imported.append(updated)
+                    else:
+                        report.failures.append((song.file_path, "Cover unavailable"))
+                if len(pending) >= batch_size:
+                    self.add_songs(pending)
+                    pending = []
+                if progress:
+                    progress(done, len(songs), song.file_path)
+        self.add_songs(pending)
+        importer.shutdown()
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def query(self, expression, limit=None, save_as=None):
+        with span("library.query"):
+            songs = self.catalog.search(expression, limit)
+        if save_as:
+            from Cassette import SmartCassette
+            cassette = SmartCassette(save_as, [], query=expression)
+            cassette.attach(self.catalog)
+            self.storage.open_cassettes().save(cassette)
+            cassette.detach()
+        return songs
+
+    def export(self, json_file):
+        with span("library.export"):
+            return self.storage.export_json(json_file)
+
+    def orphan_blobs(self):
+        store = SongStore(os.path.join(self.data_dir, "songs"))
+        if not os.path.isdir(store.root):
+            return []
+        referenced = {os.path.basename(row['file_path']) for row in self.storage.iter_rows()
+                      if store.is_blob(row['file_path'])}
+        orphans = []
+        for directory, _, files in os.walk(store.root):
+            for name in files:
+                path = os.path.join(directory, name)
+                if store.is_blob(path) and name not in referenced:
+                    orphans.append(path)
+        return orphans
+
+    def vacuum(self, dry_run=False):
+        with span("library.vacuum"):
+            orphans = self.orphan_blobs()
+            freed = sum(os.path.getsize(path) for path in orphans)
+            if dry_run:
+                return orphans, freed
+            store = SongStore(os.path.join(self.data_dir, "songs"))
+            for path in orphans:
+                store.remove(path)
+            if self.storage.catalog:
+                self.storage.catalog.vacuum()
+            cache_file = os.path.join(self.data_dir, "cache.db")
+            if os.path.exists(cache_file):
+                from ResponseCache import ResponseCache
+                cache = ResponseCache(cache_file)
+                cache.vacuum()
+                cache.close()
+            self.storage.write_snapshot()
+        return orphans, freed
+
+    def close(self):
+        if self._catalog is not None:
+            self._catalog.close()
+            self._catalog = None
+        if self._services is not None and hasattr(self._services, "close"):
+            self._services.close()
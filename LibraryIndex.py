@@ -0,0 +1,143 @@
+import re
+import unicodedata
+
+TOKEN = re.compile(r"\w+")
+FIELDS = ('title', 'artist', 'album')
+
+
+def fold(text):
+    text = text or ""
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text):
+    return TOKEN.findall(fold(text))
+
+
+class PrefixTrie():
+    def __init__(self):
+        self.root = {}
+
+    def add(self, word):
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[None] = True
+
+    def remove(self, word):
+        path = [self.root]
+        for char in word:
+            node = path[-1].get(char)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].pop(None, None)
+        for depth in range(len(word), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][word[depth - 1]]
+
+    def words(self, prefix, limit=None):
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        found = []
+        stack = [(node, prefix)]
+        while stack:
+            node, word = stack.pop()
+            if None in node:
+                found.append(word)
+                if limit and len(found) >= limit:
+                    break
+            for char, child in node.items():
+                if char is not None:
+                    stack.append((child, word + char))
+        return found
+
+
+class LibraryIndex():
+    def __init__(self):
+        self.by_path = {}
+        self.postings = {}
+        self.trie = PrefixTrie()
+        self.text_ready = False
+
+    def __len__(self):
+        return len(self.by_path)
+
+    def __contains__(self, file_path):
+        return file_path in self.by_path
+
+    def get(self, file_path):
+        return self.by_path.get(file_path)
+
+    def song_tokens(self, fields):
+        tokens = set()
+        for value in fields:
+            tokens.update(tokenize(value))
+        return tokens
+
+    def build_text(self, entries):
+        self.postings = {}
+        self.trie = PrefixTrie()
+        self.text_ready = True
+        for file_path, title, artist, album in entries:
+            self._add_tokens(file_path, (title, artist, album))
+
+    def _add_tokens(self, file_path, fields):
+        for token in self.song_tokens(fields):
+            paths = self.postings.get(token)
+            if paths is None:
+                paths = self.postings[token] = set()
+                self.trie.add(token)
+            paths.add(file_path)
+
+    def add_song(self, song, handle):
+        self.by_path[song.file_path] = handle
+        if self.text_ready:
+            self._add_tokens(song.file_path, (song.title, song.artist, song.album))
+
+    def remove_song(self, song):
+        handle = self.by_path.pop(song.file_path, None)
+        if not self.text_ready:
+            return handle
+        for token in self.song_tokens((song.title, song.artist, song.album)):
+            paths = self.postings.get(token)
+            if paths is None:
+                continue
+            paths.discard(song.file_path)
+            if not paths:
+                del self.postings[token]
+                self.trie.remove(token)
+        return handle
+
+    def update_song(self, old_song, new_song):
+        handle = self.remove_song(old_song)
+        self.add_song(new_song, handle)
+
+    def search(self, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return set()
+        *exact, last = tokens
+        candidates = []
+        for token in exact:
+            paths = self.postings.get(token)
+            if not paths:
+                return set()
+            candidates.append(paths)
+        words = self.trie.words(last)
+        if len(words) == 1:
+            candidates.append(self.postings[words[0]])
+        else:
+            candidates.append(set().union(*(self.postings[word] for word in words)))
+        candidates.sort(key=len)
+        results = set(candidates[0])
+        for paths in candidates[1:]:
+            results &= paths
+        return results
@@ -0,0 +1,175 @@
+import atexit
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("CASSETTE_METRICS", "") not in ("", "0")
+TRACE_FILE = os.environ.get("CASSETTE_TRACE", "data/trace.jsonl")
+BUCKETS_PER_OCTAVE = 4
+
+
+class Histogram():
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds):
+        micros = max(seconds * 1e6, 1.0)
+        bucket = int(math.log2(micros) * BUCKETS_PER_OCTAVE)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                upper = 2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE) / 1e6
+                return min(upper, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {"count": self.count, "total": self.total, "min": self.min if self.count else 0.0,
+                "max": self.max, "p50": self.percentile(0.5), "p95": self.percentile(0.95),
+                "p99": self.percentile(0.99)}
+
+
+class Recorder():
+    def __init__(self, trace_file=None):
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.trace = None
+        if trace_file:
+            os.makedirs(os.path.dirname(trace_file) or ".", exist_ok=True)
+            self.trace = open(trace_file, "a", buffering=1 << 16)
+
+    def record(self, name, seconds, start=None, **fields):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.record(seconds)
+            if self.trace:
+                event = {"name": name, "ms": round(seconds * 1000, 3),
+                         "at": round(((start or time.perf_counter() - seconds) - self.origin) * 1000, 3),
+                         "thread": threading.current_thread().name}
+                if fields:
+                    event.update(fields)
+                self.trace.write(json.dumps(event) + "\n")
+
+    def summary(self):
+        lines = [f"{'span':<36} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'total ms':>10}"]
+        with self.lock:
+            items = sorted(self.histograms.items(), key=lambda item: -item[1].total)
+            for name, histogram in items:
+                lines.append(f"{name:<36} {histogram.count:>7} {histogram.percentile(0.5) * 1000:>9.2f} "
+                             f"{histogram.percentile(0.95) * 1000:>9.2f} {histogram.percentile(0.99) * 1000:>9.2f} "
+                             f"{histogram.max * 1000:>9.2f} {histogram.total * 1000:>10.1f}")
+        return "\n".join(lines)
+
+    def snapshot(self):
+        with self.lock:
+            return {name: histogram.to_dict() for name, histogram in self.histograms.items()}
+
+    def close(self):
+        with self.lock:
+            if self.trace:
+                self.trace.close()
+                self.trace = None
+
+
+class Span():
+    __slots__ = ("name", "fields", "start")
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        recorder.record(self.name, elapsed, self.start, **self.fields)
+        return False
+
+
+class NullSpan():
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = NullSpan()
+recorder = None
+
+
+def enable(trace_file=TRACE_FILE):
+    global ENABLED, recorder
+    if recorder is None:
+        recorder = Recorder(trace_file)
+        atexit.register(shutdown)
+    ENABLED = True
+    return recorder
+
+
+def span(name, **fields):
+    if not ENABLED:
+        return NULL_SPAN
+    return Span(name, fields)
+
+
+def record(name, seconds, **fields):
+    if ENABLED:
+        recorder.record(name, seconds, **fields)
+
+
+def timed(name):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                recorder.record(name, time.perf_counter() - start, start)
+        return wrapper
+    return decorate
+
+
+def summary():
+    return recorder.summary() if recorder else "Metrics disabled"
+
+
+def shutdown():
+    if recorder is None:
+        return
+    if recorder.histograms:
+        print(recorder.summary())
+    recorder.close()
+
+
+if ENABLED:
+    enable()
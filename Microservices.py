@@ -0,0 +1,140 @@
+import os
+from concurrent.futures import Future
+from ZmqClient import ZmqClient
+from ServiceClient import ServiceClient, AUDIO_SERVICE_URL, COVER_SERVICE_URL
+
+
+RANDOM_FIELDS = ("result", "number", "value")
+
+
+def resolved(value) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def chain(future, transform) -> Future:
+    chained = Future()
+
+    def done(f):
+        try:
+            chained.set_result(transform(f.result()))
+        except Exception as e:
+            chained.set_result({"error": f"Microservice error: {str(e)}"})
+    future.add_done_callback(done)
+    return chained
+
+
+def first_song(response):
+    if not isinstance(response, dict) or "error" in response:
+        return response
+    return response.get("playlist", [{}])[0]
+
+
+def random_number(response):
+    if isinstance(response, dict):
+        response = next((response[key] for key in RANDOM_FIELDS if key in response), None)
+    if isinstance(response, bool) or not isinstance(response, (int, float, str)):
+        raise ValueError
+    return int(response)
+
+
+def entropy_seed(response):
+    if isinstance(response, dict) and "error" in response:
+        print(f"Error: RNG Microservice unavailable ({response['error']}), using local shuffle seed")
+        return None
+    try:
+        return random_number(response)
+    except ValueError:
+        print(f"Error: Malformed RNG reply {response!r}, using local shuffle seed")
+        return None
+
+
+class Microservices():
+    def __init__(self):
+        self.song_client = None
+        self.rng_client = None
+        self.audio_client = ServiceClient(AUDIO_SERVICE_URL)
+        self.cover_client = ServiceClient(COVER_SERVICE_URL)
+        self.audio_batch_supported = True
+        self.setup_zmq_client()
+
+    def setup_zmq_client(self):
+        try:
+            self.song_client = ZmqClient("tcp://localhost:5555")
+            self.rng_client = ZmqClient("tcp://localhost:4000")
+            print("ZeroMQ client connected to microservice")
+        except Exception as e:
+            print(f"Failed to setup ZeroMQ client: {e}")
+            self.song_client = None
+            self.rng_client = None
+
+    def get_song_info_async(self, song_name: str, artist_name: str) -> Future:
+        if not self.song_client:
+            return resolved({"error": "Song Microservice not available"})
+        request = {
+            "type": "song",
+            "song": song_name,
+            "artist": artist_name
+        }
+        return chain(self.song_client.request(request), first_song)
+
+    def get_song_info(self, song_name: str, artist_name: str) -> dict:
+        return self.get_song_info_async(song_name, artist_name).result()
+
+    def get_random_num_async(self, max) -> Future:
+        if not self.rng_client:
+            return resolved({"error": "RNG Microservice not available"})
+        request = {
+            "method": "rand",
+            "params": {"min": 0, "max": max}
+        }
+        return self.rng_client.request(request)
+
+    def get_random_num(self, max):
+        return self.get_random_num_async(max).result()
+
+    def get_entropy_async(self) -> Future:
+        return chain(self.get_random_num_async(2 ** 31 - 1), entropy_seed)
+
+    def analyze_audio(self, file) -> dict:
+        result = self.audio_client.get("/audio-analysis", {"file_path": os.path.abspath(file)})
+        return self._analysis(result)
+
+    def _analysis(self, result):
+        if "error" in result:
+            return {"error": result["error"]}
+        if result.get("status") != "success":
+            return {"error": result.get("message", "Audio analysis failed")}
+        return {"bpm": result["bpm"], "duration": result["duration"]}
+
+    def analyze_audio_batch(self, files) -> list:
+        if self.audio_batch_supported:
+            paths = [os.path.abspath(file) for file in files]
+            result = self.audio_client.post("/audio-analysis/batch", {"file_paths": paths})
+            if result.get("status_code") in (404, 405):
+                self.audio_batch_supported = False
+            elif "error" in result:
+                return [{"error": result["error"]} for _ in files]
+            else:
+                by_path = {item.get("file_path"): item for item in result.get("results", [])}
+                return [self._analysis(by_path.get(path, {"error": "Missing from batch response"}))
+                        for path in paths]
+        return [self.analyze_audio(file) for file in files]
+
+    def process_cover(self, url, size=200) -> dict:
+        result = self.cover_client.post("/api/cover/process", {"image_url": url, "size": size})
+        if "error" in result:
+            return {"error": result["error"]}
+        if result.get("status") != "success":
+            return {"error": result.get("message", "Cover processing failed")}
+        return {"image_data": bytes.fromhex(result["image_data"]),
+                "dimensions": result.get("dimensions"),
+                "format": result.get("format")}
+
+    def close(self):
+        for client in (self.song_client, self.rng_client):
+            if client:
+                client.close()
+        self.audio_client.close()
+        self.cover_client.close()
@@ -1,21 +1,169 @@
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from Storage import Storage
 import pygame
 from Song import Song
+from ShuffleQueue import ShuffleQueue
+from LibraryEngine import LibraryEngine
+from Metrics import timed
+
+END_EVENT = pygame.USEREVENT + 1
 
 class MusicPlayer():
     def __init__(self, storage):
-        pygame.mixer.init()
+        self.mixer_lock = threading.Lock()
         self.current_song = None
         self.status = "stopped"
         self.storage = storage
-        self.songs = storage.load_songs()
+        self.library = LibraryEngine(storage)
+        self.songs = self.library.catalog
         self.playlist_length = len(self.songs)
+        self.shuffle = ShuffleQueue(self.songs.keys())
+        self.loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preload")
+        self.preloaded = {}
+        self.upcoming = None
+        self.queued = False
+        self.auto_advance = True
+        self.skip_mode = "shuffle"
+        self.end_events = False
+        self.started_at = 0
+
+    def seed_shuffle(self, seed):
+        if seed is not None:
+            self.shuffle.reseed(seed)
+
+    def set_skip_mode(self, mode):
+        self.skip_mode = mode
+        if not self.queued:
+            self.preload_next()
+
+    def similar_key(self):
+        if self.skip_mode != "similar" or not self.current_song:
+            return None
+        for k in (8, 64):
+            for song in self.songs.similar(self.current_song, k):
+                if self.shuffle.pending(song.file_path):
+                    return song.file_path
+        return None
+
+    def next_song(self):
+        current = self.current_song.file_path if self.current_song else None
+        key = None
+        if self.upcoming and self.upcoming.file_path != current:
+            key = self.shuffle.take(self.upcoming.file_path)
+        if key is None:
+            key = self.shuffle.take(self.similar_key())
+        if key is None:
+            key = self.shuffle.next(current)
+        return self.songs.get(key) if key is not None else None
+
+    def skip(self):
+        song = self.next_song()
+        if song and self.load_song(song):
+            self.play()
+        return song
+
+    def read_file(self, file_path):
+        with open(file_path, "rb") as f:
+            return f.read()
+
+    def preload_next(self):
+        current = self.current_song.file_path if self.current_song else None
+        key = self.similar_key() or self.shuffle.peek(current)
+        self.upcoming = self.songs.get(key) if key is not None and key != current else None
+        keep = {path: future for path, future in self.preloaded.items() if path == current}
+        if self.upcoming:
+            path = self.upcoming.file_path
+            keep[path] = self.preloaded.get(path) or self.loader.submit(self.read_file, path)
+        self.preloaded = keep
+
+    def source(self, song: Song):
+        future = self.preloaded.get(song.file_path)
+        if future and future.done() and not future.exception():
+            hint = os.path.splitext(song.file_path)[1].lstrip(".")
+            return io.BytesIO(future.result()), hint
+        return song.file_path, ""
+
+    def queue_next(self):
+        if self.queued or not self.upcoming or self.status != "playing":
+            return
+        try:
+            pygame.mixer.music.queue(*self.source(self.upcoming))
+            self.queued = True
+        except Exception as e:
+            print(f"Error queueing song: {e}")
+
+    def ensure_mixer(self):
+        with self.mixer_lock:
+            if not pygame.mixer.get_init():
+                try:
+                    pygame.mixer.init()
+                except pygame.error as e:
+                    print(f"Error initialising audio: {e}")
+                    return False
+        return True
+
+    def enable_end_events(self):
+        self.ensure_mixer()
+        if not pygame.display.get_init():
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            pygame.display.init()
+        pygame.mixer.music.set_endevent(END_EVENT)
+        self.end_events = True
+
+    def discard_end_events(self):
+        if self.end_events:
+            pygame.event.clear(END_EVENT)
+
+    def finished_tracks(self):
+        if not self.end_events:
+            return 0
+        return len(pygame.event.get(END_EVENT))
+
+    def on_track_end(self):
+        if self.queued:
+            return self.advance()
+        self.status = "stopped"
+        self.started_at = 0
+        if self.auto_advance:
+            return self.skip()
+        return None
+
+    def position(self):
+        if not self.current_song or self.status == "stopped":
+            return 0.0
+        return max(0, pygame.mixer.music.get_pos() - self.started_at) / 1000
+
+    def progress(self):
+        duration = self.current_song.duration if self.current_song else 0
+        return min(1.0, self.position() / duration) if duration else 0.0
+
+    def advance(self):
+        if not self.queued or not self.upcoming:
+            return None
+        song = self.upcoming
+        self.started_at = 0
+        if self.shuffle.take(song.file_path) is None:
+            self.shuffle.next(self.current_song.file_path if self.current_song else None)
+        self.current_song = song
+        self.queued = False
+        self.preload_next()
+        self.queue_next()
+        return song
     
+    @timed("player.load_song")
     def load_song(self, song: Song):
         try:
-            pygame.mixer.music.load(song.file_path)
+            self.ensure_mixer()
+            pygame.mixer.music.load(*self.source(song))
+            self.discard_end_events()
             self.current_song = song
             self.status = "stopped"
+            self.started_at = 0
+            self.queued = False
+            self.preload_next()
             print(f"Loaded: {song.file_path}")
             return True
         except Exception as e:
@@ -29,6 +177,7 @@ class MusicPlayer():
         if self.status == "stopped":
             pygame.mixer.music.play()
             self.status = "playing"
+            self.queue_next()
             print(f"Started: {self.current_song.title}")
         if self.status == "paused":
             pygame.mixer.music.unpause()
@@ -42,22 +191,35 @@ class MusicPlayer():
             print(f"Paused: {self.current_song.title}")
     
     def stop(self):
-        pygame.mixer.music.stop()
-        self.player_state = "stopped"
+        if self.ensure_mixer():
+            pygame.mixer.music.stop()
+            self.discard_end_events()
+        self.queued = False
+        self.status = "stopped"
+        self.started_at = 0
     
     def add_song(self, song: Song):
-        self.songs.append(song)
-        self.playlist_length += 1
+        self.add_songs([song])
+
+    def add_songs(self, songs):
+        songs = list(songs)
+        self.library.add_songs(songs)
+        for song in songs:
+            self.shuffle.add(song.file_path)
+        self.playlist_length = len(self.songs)
 
     def delete_current_song(self):
         if self.current_song:
-            self.songs = self.storage.delete_song(self.current_song, self.songs)
-            if self.current_song.file_path not in [s.file_path for s in self.songs]:
-                self.stop()
-                self.current_song = None
+            self.stop()
+            self.library.remove_song(self.current_song)
+            self.shuffle.remove(self.current_song.file_path)
+            self.playlist_length = len(self.songs)
+            self.current_song = None
+            self.upcoming = None
+            self.preloaded = {}
     
     def update_current_song(self, updated_song: Song):
         if self.current_song:
             original_song = self.current_song
-            self.songs = self.storage.update_song(original_song, updated_song, self.songs)
+            self.library.update_song(original_song.file_path, updated_song)
             self.current_song = updated_song
\ No newline at end of file
@@ -0,0 +1,59 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+
+class PlaybackScheduler(QObject):
+    track_changed = pyqtSignal(object)
+    state_changed = pyqtSignal(str)
+    position_changed = pyqtSignal(float, float)
+
+    def __init__(self, player, interval=250):
+        super().__init__()
+        self.player = player
+        self.player.enable_end_events()
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.tick)
+
+    def toggle(self):
+        if self.player.status == "playing":
+            self.player.pause()
+        else:
+            self.player.play()
+        self.sync()
+
+    def load(self, song):
+        if self.player.load_song(song):
+            self.track_changed.emit(song)
+        self.sync()
+
+    def skip(self):
+        song = self.player.skip()
+        if song is not None:
+            self.track_changed.emit(song)
+        self.sync()
+        return song
+
+    def stop(self):
+        self.player.stop()
+        self.sync()
+
+    def sync(self):
+        playing = self.player.status == "playing"
+        if playing and not self.timer.isActive():
+            self.timer.start()
+        elif not playing and self.timer.isActive():
+            self.timer.stop()
+        self.state_changed.emit(self.player.status)
+        self.position_changed.emit(self.player.position(), self.player.progress())
+
+    def tick(self):
+        changed = False
+        for _ in range(self.player.finished_tracks()):
+            song = self.player.on_track_end()
+            if song is not None:
+                self.track_changed.emit(song)
+            changed = True
+        if changed or self.player.status != "playing":
+            self.sync()
+        else:
+            self.position_changed.emit(self.player.position(), self.player.progress())
@@ -0,0 +1,270 @@
+import re
+import numpy as np
+from LibraryIndex import fold
+from SongTable import Vocabulary
+
+NUMERIC_FIELDS = ('bpm', 'duration')
+TERM = re.compile(r'(-?)(\w+):("[^"]*"|\S+)')
+COMPARISON = re.compile(r'(<=|>=|<|>)(.+)')
+
+
+def genre_set(value):
+    return {fold(part.strip()) for part in (value or "").split(",") if part.strip()}
+
+
+def parse_number(field, text):
+    try:
+        if field == 'duration' and ":" in text:
+            minutes, seconds = text.split(":", 1)
+            return int(minutes) * 60 + float(seconds)
+        return float(text)
+    except ValueError:
+        raise ValueError(f"Invalid {field} value: {text!r}")
+
+
+class Expression():
+    def __and__(self, other):
+        return All([self, other])
+
+    def __or__(self, other):
+        return Any([self, other])
+
+    def __invert__(self):
+        return Not(self)
+
+    def mask(self, index):
+        raise NotImplementedError
+
+    def match(self, song):
+        raise NotImplementedError
+
+
+class Range(Expression):
+    def __init__(self, field, low=None, high=None, low_open=False, high_open=False):
+        if field not in NUMERIC_FIELDS:
+            raise ValueError(f"Unknown numeric field: {field}")
+        self.field = field
+        self.low = low
+        self.high = high
+        self.low_open = low_open
+        self.high_open = high_open
+
+    def mask(self, index):
+        column = index.column(self.field)
+        mask = column > 0
+        if self.low is not None:
+            mask &= column > self.low if self.low_open else column >= self.low
+        if self.high is not None:
+            mask &= column < self.high if self.high_open else column <= self.high
+        return mask
+
+    def match(self, song):
+        value = getattr(song, self.field)
+        if value <= 0:
+            return False
+        if self.low is not None and (value <= self.low if self.low_open else value < self.low):
+            return False
+        if self.high is not None and (value >= self.high if self.high_open else value > self.high):
+            return False
+        return True
+
+    def __repr__(self):
+        return f"Range({self.field!r}, {self.low!r}, {self.high!r})"
+
+
+class Genre(Expression):
+    def __init__(self, *genres):
+        self.genres = {fold(genre) for genre in genres}
+
+    def mask(self, index):
+        lookup = index.genre_lookup(self.genres)
+        if not len(lookup):
+            return np.zeros(index.size, dtype=bool)
+        return lookup[index.column('genre')]
+
+    def match(self, song):
+        return not self.genres.isdisjoint(genre_set(song.genre))
+
+    def __repr__(self):
+        return f"Genre({', '.join(map(repr, sorted(self.genres)))})"
+
+
+class All(Expression):
+    def __init__(self, terms):
+        self.terms = list(terms)
+
+    def mask(self, index):
+        mask = np.ones(index.size, dtype=bool)
+        for term in self.terms:
+            mask &= term.mask(index)
+        return mask
+
+    def match(self, song):
+        return all(term.match(song) for term in self.terms)
+
+
+class Any(Expression):
+    def __init__(self, terms):
+        self.terms = list(terms)
+
+    def mask(self, index):
+        mask = np.zeros(index.size, dtype=bool)
+        for term in self.terms:
+            mask |= term.mask(index)
+        return mask
+
+    def match(self, song):
+        return any(term.match(song) for term in self.terms)
+
+
+class Not(Expression):
+    def __init__(self, term):
+        self.term = term
+
+    def mask(self, index):
+        return ~self.term.mask(index)
+
+    def match(self, song):
+        return not self.term.match(song)
+
+
+class Field():
+    def __init__(self, name):
+        self.name = name
+
+    def between(self, low, high):
+        return Range(self.name, low, high)
+
+    def __lt__(self, value):
+        return Range(self.name, high=value, high_open=True)
+
+    def __le__(self, value):
+        return Range(self.name, high=value)
+
+    def __gt__(self, value):
+        return Range(self.name, low=value, low_open=True)
+
+    def __ge__(self, value):
+        return Range(self.name, low=value)
+
+
+def parse_term(field, value):
+    if field == 'genre':
+        return Genre(*value.split(","))
+    comparison = COMPARISON.fullmatch(value)
+    if comparison:
+        operator, number = comparison.groups()
+        number = parse_number(field, number)
+        return Range(field, low=number if ">" in operator else None, high=number if "<" in operator else None,
+                     low_open=operator == ">", high_open=operator == "<")
+    if ".." in value:
+        low, high = value.split("..", 1)
+        return Range(field, parse_number(field, low) if low else None, parse_number(field, high) if high else None)
+    number = parse_number(field, value)
+    return Range(field, number - 0.5, number + 0.5, high_open=True)
+
+
+def parse(text):
+    terms = []
+    rest = []
+    position = 0
+    for found in TERM.finditer(text):
+        negate, field, value = found.groups()
+        if field.lower() not in NUMERIC_FIELDS + ('genre',):
+            continue
+        term = parse_term(field.lower(), value.strip('"'))
+        terms.append(Not(term) if negate else term)
+        rest.append(text[position:found.start()])
+        position = found.end()
+    rest.append(text[position:])
+    if not terms:
+        return None, text
+    return (terms[0] if len(terms) == 1 else All(terms)), " ".join("".join(rest).split())
+
+
+class QueryIndex():
+    def __init__(self, base_count=0):
+        self.base_count = base_count
+        self.size = 0
+        self.bpm = np.zeros(0)
+        self.duration = np.zeros(0)
+        self.genre = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.vocab = Vocabulary()
+        self.genre_sets = []
+
+    @classmethod
+    def build(cls, reader, handles, edited, added) -> 'QueryIndex':
+        index = cls(len(reader) if reader else 0)
+        index.reserve(index.base_count + len(added))
+        if reader:
+            base = index.base_count
+            index.bpm[:base] = np.frombuffer(reader.floats['bpm'], dtype=np.float64)
+            index.duration[:base] = np.frombuffer(reader.floats['duration'], dtype=np.float64)
+            index.genre[:base] = np.frombuffer(reader.codes['genre'], dtype=np.uint32)
+            index.vocab = Vocabulary(reader.vocab['genre'])
+        index.size = index.base_count
+        for song in added:
+            index.size += 1
+            if song is not None:
+                index.set(index.size - 1, song)
+        for handle, song in edited.items():
+            index.set(handle, song)
+        rows = np.frombuffer(handles, dtype=np.int64) if len(handles) else np.zeros(0, dtype=np.int64)
+        index.alive[index.slots(rows)] = True
+        return index
+
+    def reserve(self, count):
+        if count <= len(self.alive):
+            return
+        capacity = max(count, 2 * len(self.alive), 64)
+        for name in ('bpm', 'duration', 'genre', 'alive'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def slot(self, handle):
+        return handle if handle >= 0 else self.base_count + ~handle
+
+    def slots(self, handles):
+        handles = np.asarray(handles, dtype=np.int64)
+        return np.where(handles >= 0, handles, self.base_count + ~handles)
+
+    def handles(self, slots):
+        return np.where(slots < self.base_count, slots, ~(slots - self.base_count))
+
+    def column(self, name):
+        return getattr(self, name)[:self.size]
+
+    def set(self, slot, song):
+        self.bpm[slot] = song.bpm
+        self.duration[slot] = song.duration
+        self.genre[slot] = self.vocab.code(song.genre or "")
+
+    def add_song(self, song, handle):
+        slot = self.slot(handle)
+        self.reserve(slot + 1)
+        self.size = max(self.size, slot + 1)
+        self.set(slot, song)
+        self.alive[slot] = True
+
+    def remove_song(self, handle):
+        self.alive[self.slot(handle)] = False
+
+    def update_song(self, song, handle):
+        self.set(self.slot(handle), song)
+
+    def genre_lookup(self, genres):
+        for value in self.vocab.values[len(self.genre_sets):]:
+            self.genre_sets.append(genre_set(value))
+        return np.fromiter((not genres.isdisjoint(names) for names in self.genre_sets),
+                           dtype=bool, count=len(self.genre_sets))
+
+    def select(self, expression, candidates=None):
+        mask = self.alive[:self.size] & expression.mask(self)
+        if candidates is not None:
+            keep = np.zeros(self.size, dtype=bool)
+            keep[self.slots(list(candidates))] = True
+            mask &= keep
+        return self.handles(np.flatnonzero(mask)).tolist()
@@ -0,0 +1,178 @@
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from LibraryIndex import fold
+
+
+def song_key(song_name, artist_name):
+    return "song:" + " ".join(fold(song_name).split()) + "|" + " ".join(fold(artist_name).split())
+
+
+def cover_key(url, size):
+    return f"cover:{size}:{url}"
+
+
+def encode_cover(result):
+    meta = {k: v for k, v in result.items() if k != "image_data"}
+    return json.dumps(meta).encode("utf-8") + b"\n" + result["image_data"]
+
+
+def decode_cover(data):
+    meta, image_data = bytes(data).split(b"\n", 1)
+    return {**json.loads(meta), "image_data": image_data}
+
+
+class ResponseCache():
+    def __init__(self, db_file="data/cache.db", ttl=30 * 24 * 3600, max_bytes=64 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+        self.used_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if now - created > self.ttl:
+                self._delete(key)
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return value
+
+    def put(self, key, value: bytes):
+        now = time.time()
+        with self.lock:
+            self._delete(key)
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value), now, now)
+                )
+            self.used_bytes += len(value)
+            self._evict()
+
+    def _delete(self, key):
+        row = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        if row:
+            with self.conn:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.used_bytes -= row[0]
+
+    def _evict(self):
+        if self.used_bytes <= self.max_bytes:
+            return
+        with self.conn:
+            self.conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+            self.used_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            cursor = self.conn.execute("SELECT key, size FROM responses ORDER BY accessed")
+            victims = []
+            for key, size in cursor:
+                if self.used_bytes <= self.max_bytes:
+                    break
+                victims.append((key,))
+                self.used_bytes -= size
+            self.conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def fetch(self, key, loader, encode=None, decode=None, cacheable=None):
+        encode = encode or (lambda value: json.dumps(value).encode("utf-8"))
+        decode = decode or (lambda data: json.loads(data))
+        cached = self.get(key)
+        if cached is not None:
+            return decode(cached)
+
+        with self.lock:
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self.in_flight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            cached = self.get(key)
+            if cached is not None:
+                value = decode(cached)
+                future.set_result(value)
+                return value
+            value = loader()
+            if cacheable is None or cacheable(value):
+                self.put(key, encode(value))
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+        return value
+
+    def invalidate(self, key):
+        with self.lock:
+            self._delete(key)
+
+    def clear(self):
+        with self.lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM responses")
+            self.used_bytes = 0
+
+    def vacuum(self):
+        with self.lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+            self.used_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self._evict()
+            self.conn.execute("VACUUM")
+
+    def close(self):
+        self.conn.close()
+
+
+class CachedServices():
+    def __init__(self, services, cache: ResponseCache):
+        self.services = services
+        self.cache = cache
+
+    def get_song_info(self, song_name, artist_name):
+        return self.cache.fetch(
+            song_key(song_name, artist_name),
+            lambda: self.services.get_song_info(song_name, artist_name),
+            cacheable=lambda info: "error" not in info
+        )
+
+    def process_cover(self, url, size=200):
+        return self.cache.fetch(
+            cover_key(url, size),
+            lambda: self.services.process_cover(url, size),
+            encode=encode_cover,
+            decode=decode_cover,
+            cacheable=lambda result: "error" not in result
+        )
+
+    def invalidate_cover(self, url, size=200):
+        self.cache.invalidate(cover_key(url, size))
+
+    def __getattr__(self, name):
+        return getattr(self.services, name)
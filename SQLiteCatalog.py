@@ -0,0 +1,153 @@
+import json
+import sqlite3
+from Song import Song
+
+COLUMNS = ['file_path', 'title', 'artist', 'album', 'genre',
+           'duration', 'cover_url', 'cover_path', 'bpm']
+
+
+class SQLiteCatalog():
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.create_tables()
+
+    def create_tables(self):
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS songs (
+                    file_path TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    artist TEXT NOT NULL,
+                    album TEXT,
+                    genre TEXT,
+                    duration REAL,
+                    cover_url TEXT,
+                    cover_path TEXT,
+                    bpm REAL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS songs_title ON songs(title)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS songs_artist ON songs(artist)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            """)
+
+    def _row(self, song):
+        data = song.to_dict()
+        return tuple(data[c] for c in COLUMNS)
+
+    def _song(self, row):
+        return Song.from_dict(dict(zip(COLUMNS, row)))
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM songs LIMIT 1").fetchone() is None
+
+    def iter_rows(self):
+        cursor = self.conn.execute(f"SELECT {', '.join(COLUMNS)} FROM songs ORDER BY rowid")
+        for row in cursor:
+            yield dict(zip(COLUMNS, row))
+
+    def load_songs(self):
+        return [Song.from_dict(row) for row in self.iter_rows()]
+
+    def get_song(self, file_path):
+        row = self.conn.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM songs WHERE file_path = ?",
+            (file_path,)
+        ).fetchone()
+        return self._song(row) if row else None
+
+    def add_song(self, song):
+        with self.conn:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO songs ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                self._row(song)
+            )
+
+    def add_songs(self, songs):
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO songs ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                (self._row(song) for song in songs)
+            )
+
+    def update_song(self, file_path, updated_song):
+        assignments = ', '.join(f"{c} = ?" for c in COLUMNS)
+        with self.conn:
+            cursor = self.conn.execute(
+                f"UPDATE songs SET {assignments} WHERE file_path = ?",
+                self._row(updated_song) + (file_path,)
+            )
+        return cursor.rowcount > 0
+
+    def update_analysis(self, results):
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE songs SET duration = ?, bpm = ? WHERE file_path = ?",
+                ((duration, bpm, file_path) for file_path, duration, bpm in results)
+            )
+
+    def delete_song(self, file_path):
+        with self.conn:
+            cursor = self.conn.execute("DELETE FROM songs WHERE file_path = ?", (file_path,))
+        return cursor.rowcount > 0
+
+    def replace_all(self, songs):
+        with self.conn:
+            self.conn.execute("DELETE FROM songs")
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO songs ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                (self._row(song) for song in songs)
+            )
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def migrate_from_json(self, json_file):
+        if self.get_meta('migrated_from'):
+            return 0
+        try:
+            with open(json_file, 'r') as f:
+                loaded_songs = json.load(f)
+        except FileNotFoundError:
+            loaded_songs = []
+        songs = [Song.from_dict(song) for song in loaded_songs]
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO songs ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                (self._row(song) for song in songs)
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from', ?)",
+                (json_file,)
+            )
+        print(f"Migrated {len(songs)} songs from {json_file}")
+        return len(songs)
+
+    def export_json(self, json_file):
+        with open(json_file, 'w') as f:
+            json.dump(list(self.iter_rows()), f, indent=4)
+
+    def vacuum(self):
+        self.conn.execute("VACUUM")
+        self.conn.execute("PRAGMA optimize")
+
+    def close(self):
+        self.conn.close()
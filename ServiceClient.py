@@ -0,0 +1,61 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from Metrics import span
+
+COVER_SERVICE_URL = "http://localhost:5001"
+AUDIO_SERVICE_URL = "http://localhost:5002"
+
+
+class ServiceClient():
+    def __init__(self, base_url, timeout=(3.05, 30), retries=3, backoff=0.3, pool_size=8):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST"]),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, path, payload=None, timeout=None) -> dict:
+        with span(f"http{path}", method=method):
+            return self._send(method, path, payload, timeout)
+
+    def _send(self, method, path, payload, timeout) -> dict:
+        try:
+            response = self.session.request(
+                method,
+                self.base_url + path,
+                json=payload,
+                timeout=timeout or self.timeout
+            )
+        except requests.exceptions.Timeout:
+            return {"error": f"Timed out calling {self.base_url}{path}"}
+        except requests.exceptions.ConnectionError:
+            return {"error": f"Can't connect to {self.base_url}"}
+        except requests.exceptions.RequestException as e:
+            return {"error": f"Request to {self.base_url}{path} failed: {e}"}
+        if response.status_code >= 400:
+            return {"error": f"{self.base_url}{path} returned HTTP {response.status_code}",
+                    "status_code": response.status_code}
+        try:
+            return response.json()
+        except ValueError:
+            return {"error": f"Invalid JSON from {self.base_url}{path}"}
+
+    def get(self, path, payload=None, timeout=None) -> dict:
+        return self.request("GET", path, payload, timeout)
+
+    def post(self, path, payload=None, timeout=None) -> dict:
+        return self.request("POST", path, payload, timeout)
+
+    def close(self):
+        self.session.close()
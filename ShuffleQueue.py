@@ -0,0 +1,99 @@
+import os
+import random
+
+
+class ShuffleQueue():
+    def __init__(self, keys=(), seed=None):
+        self.rng = random.Random(seed if seed is not None else os.urandom(16))
+        self.order = []
+        self.position = {}
+        self.cursor = 0
+        for key in keys:
+            if key not in self.position:
+                self.position[key] = len(self.order)
+                self.order.append(key)
+        self.shuffle()
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, key):
+        return key in self.position
+
+    def pending(self, key):
+        index = self.position.get(key)
+        return index is not None and index >= self.cursor
+
+    def remaining(self):
+        return len(self.order) - self.cursor
+
+    def _swap(self, i, j):
+        if i == j:
+            return
+        order = self.order
+        order[i], order[j] = order[j], order[i]
+        self.position[order[i]] = i
+        self.position[order[j]] = j
+
+    def _shuffle_from(self, start):
+        order = self.order
+        for i in range(len(order) - 1, start, -1):
+            self._swap(i, self.rng.randint(start, i))
+
+    def shuffle(self, avoid=None):
+        self.cursor = 0
+        self._shuffle_from(0)
+        if avoid is not None and len(self.order) > 1 and self.order[0] == avoid:
+            self._swap(0, self.rng.randint(1, len(self.order) - 1))
+
+    def reseed(self, seed):
+        self.rng.seed(seed)
+        self._shuffle_from(self.cursor)
+
+    def peek(self, current=None):
+        if not self.order:
+            return None
+        if self.cursor >= len(self.order):
+            self.shuffle(avoid=current)
+        key = self.order[self.cursor]
+        if key == current and self.cursor + 1 < len(self.order):
+            return self.order[self.cursor + 1]
+        return key
+
+    def next(self, current=None):
+        if not self.order:
+            return None
+        if self.cursor >= len(self.order):
+            self.shuffle(avoid=current)
+        key = self.order[self.cursor]
+        self.cursor += 1
+        if key == current and len(self.order) > 1:
+            return self.next(current)
+        return key
+
+    def take(self, key):
+        index = self.position.get(key)
+        if index is None or index < self.cursor:
+            return None
+        self._swap(index, self.cursor)
+        self.cursor += 1
+        return key
+
+    def add(self, key):
+        if key in self.position:
+            return
+        self.position[key] = len(self.order)
+        self.order.append(key)
+        self._swap(len(self.order) - 1, self.rng.randint(self.cursor, len(self.order) - 1))
+
+    def remove(self, key):
+        index = self.position.get(key)
+        if index is None:
+            return
+        if index < self.cursor:
+            self._swap(index, self.cursor - 1)
+            index = self.cursor - 1
+            self.cursor -= 1
+        self._swap(index, len(self.order) - 1)
+        self.order.pop()
+        del self.position[key]
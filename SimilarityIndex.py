@@ -0,0 +1,200 @@
+import heapq
+import math
+import zlib
+import numpy as np
+from LibraryIndex import tokenize
+
+GENRE_DIMS = 6
+DIMS = 2 + GENRE_DIMS
+BPM_WEIGHT = 1 / math.log2(1.06)
+DURATION_WEIGHT = 0.5
+GENRE_WEIGHT = 3.0
+DEFAULT_BPM = 120.0
+DEFAULT_DURATION = 210.0
+LEAF_SIZE = 64
+
+
+def token_vector(token):
+    vector = np.random.default_rng(zlib.crc32(token.encode("utf-8"))).standard_normal(GENRE_DIMS)
+    return vector / np.linalg.norm(vector)
+
+
+def genre_vector(genre):
+    vector = np.zeros(GENRE_DIMS)
+    for token in set(tokenize(genre)):
+        vector += token_vector(token)
+    norm = np.linalg.norm(vector)
+    return vector * (GENRE_WEIGHT / norm) if norm else vector
+
+
+def feature_matrix(bpm, duration, genres):
+    bpm = np.where(bpm > 0, bpm, DEFAULT_BPM)
+    duration = np.where(duration > 0, duration, DEFAULT_DURATION)
+    vectors = np.empty((len(bpm), DIMS))
+    vectors[:, 0] = np.log2(bpm) * BPM_WEIGHT
+    vectors[:, 1] = np.log2(duration) * DURATION_WEIGHT
+    vectors[:, 2:] = genres
+    return vectors
+
+
+class KDTree():
+    def __init__(self, points, slots, leaf_size=LEAF_SIZE):
+        self.points = points
+        self.slots = slots
+        self.dim = []
+        self.split = []
+        self.children = []
+        self.bounds = []
+        if len(slots):
+            self._build(leaf_size)
+
+    def _node(self, dim, split, children, bounds):
+        self.dim.append(dim)
+        self.split.append(split)
+        self.children.append(children)
+        self.bounds.append(bounds)
+        return len(self.dim) - 1
+
+    def _build(self, leaf_size):
+        order = np.arange(len(self.slots))
+        root = self._node(-1, 0.0, None, (0, len(order)))
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            start, end = self.bounds[node]
+            if end - start <= leaf_size:
+                continue
+            block = self.points[order[start:end]]
+            spread = block.max(axis=0) - block.min(axis=0)
+            dim = int(spread.argmax())
+            if spread[dim] == 0:
+                continue
+            middle = (end - start) // 2
+            part = np.argpartition(block[:, dim], middle)
+            order[start:end] = order[start:end][part]
+            split = float(self.points[order[start + middle], dim])
+            left = self._node(-1, 0.0, None, (start, start + middle))
+            right = self._node(-1, 0.0, None, (start + middle, end))
+            self.dim[node] = dim
+            self.split[node] = split
+            self.children[node] = (left, right)
+            stack.extend((left, right))
+        self.points = np.ascontiguousarray(self.points[order])
+        self.slots = self.slots[order]
+
+    def query(self, point, k, usable, best):
+        if not self.dim:
+            return best
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if len(best) == k and bound >= -best[0][0]:
+                continue
+            children = self.children[node]
+            if children is None:
+                start, end = self.bounds[node]
+                merge(best, k, self.slots[start:end], self.points[start:end], point, usable)
+                continue
+            diff = point[self.dim[node]] - self.split[node]
+            near, far = children if diff < 0 else children[::-1]
+            stack.append((far, max(bound, diff * diff)))
+            stack.append((near, bound))
+        return best
+
+
+def merge(best, k, slots, points, point, usable):
+    keep = usable[slots]
+    if not keep.all():
+        slots = slots[keep]
+        points = points[keep]
+    if not len(slots):
+        return
+    distances = ((points - point) ** 2).sum(axis=1)
+    if len(distances) > k:
+        nearest = np.argpartition(distances, k)[:k]
+        slots = slots[nearest]
+        distances = distances[nearest]
+    for slot, distance in zip(slots.tolist(), distances.tolist()):
+        if len(best) < k:
+            heapq.heappush(best, (-distance, slot))
+        elif distance < -best[0][0]:
+            heapq.heapreplace(best, (-distance, slot))
+
+
+class SimilarityIndex():
+    def __init__(self, query_index, rebuild_ratio=0.05):
+        self.query_index = query_index
+        self.rebuild_ratio = rebuild_ratio
+        self.genres = {}
+        self.vectors = np.zeros((0, DIMS))
+        self.in_tree = np.zeros(0, dtype=bool)
+        self.pending = set()
+        self.tree = KDTree(self.vectors, np.zeros(0, dtype=np.int64))
+
+    @classmethod
+    def build(cls, query_index) -> 'SimilarityIndex':
+        index = cls(query_index)
+        vocab = query_index.vocab.values
+        table = np.array([index.genre(value) for value in vocab]) if vocab else np.zeros((1, GENRE_DIMS))
+        size = query_index.size
+        index.reserve(len(query_index.alive))
+        index.vectors[:size] = feature_matrix(query_index.column('bpm'), query_index.column('duration'),
+                                              table[query_index.column('genre')])
+        index.rebuild()
+        return index
+
+    def genre(self, value):
+        vector = self.genres.get(value)
+        if vector is None:
+            vector = self.genres[value] = genre_vector(value)
+        return vector
+
+    def vector(self, song):
+        return feature_matrix(np.array([song.bpm]), np.array([song.duration]), self.genre(song.genre or ""))[0]
+
+    def reserve(self, count):
+        if count <= len(self.vectors):
+            return
+        capacity = max(count, 2 * len(self.vectors), 64)
+        grown = np.zeros((capacity, DIMS))
+        grown[:len(self.vectors)] = self.vectors
+        self.vectors = grown
+        in_tree = np.zeros(capacity, dtype=bool)
+        in_tree[:len(self.in_tree)] = self.in_tree
+        self.in_tree = in_tree
+
+    def rebuild(self):
+        slots = np.flatnonzero(self.query_index.alive[:self.query_index.size])
+        self.tree = KDTree(self.vectors[slots], slots)
+        self.in_tree[:] = False
+        self.in_tree[slots] = True
+        self.pending = set()
+
+    def add_song(self, song, handle):
+        slot = self.query_index.slot(handle)
+        self.reserve(slot + 1)
+        self.vectors[slot] = self.vector(song)
+        self.in_tree[slot] = False
+        self.pending.add(slot)
+
+    def remove_song(self, handle):
+        slot = self.query_index.slot(handle)
+        self.in_tree[slot] = False
+        self.pending.discard(slot)
+
+    def update_song(self, song, handle):
+        self.add_song(song, handle)
+
+    def nearest(self, song, k=10, exclude=()):
+        if len(self.pending) > max(256, self.rebuild_ratio * self.query_index.size):
+            self.rebuild()
+        point = self.vector(song)
+        usable = self.in_tree.copy()
+        skipped = [self.query_index.slot(handle) for handle in exclude]
+        usable[skipped] = False
+        best = self.tree.query(point, k, usable, [])
+        pending = np.array(sorted(self.pending.difference(skipped)), dtype=np.int64)
+        if len(pending):
+            merge(best, k, pending, self.vectors[pending], point, np.ones(len(self.vectors), dtype=bool))
+        best.sort(reverse=True)
+        return self.query_index.handles(np.array([slot for _, slot in best], dtype=np.int64)).tolist()
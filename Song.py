@@ -2,7 +2,13 @@ from dataclasses import dataclass
 import os
 from typing import Optional
 
-@dataclass
+def as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+@dataclass(slots=True)
 class Song:
     file_path: str
     title: str
@@ -19,6 +25,8 @@ class Song:
             self.title = os.path.basename(self.file_path)
         if not self.artist:
             self.artist = "Unknown Artist"
+        self.duration = as_float(self.duration)
+        self.bpm = as_float(self.bpm)
     
     def to_dict(self) -> dict:
           return {
@@ -0,0 +1,226 @@
+import heapq
+from array import array
+from collections import OrderedDict
+from Song import Song
+from LibraryIndex import LibraryIndex
+
+ADDED_ORDER = 1 << 62
+
+
+class CatalogListener():
+    def begin_insert(self, position):
+        pass
+
+    def end_insert(self):
+        pass
+
+    def begin_remove(self, position):
+        pass
+
+    def end_remove(self):
+        pass
+
+    def row_changed(self, position):
+        pass
+
+
+class SongCatalog():
+    def __init__(self, reader=None, cache_size=256):
+        self.reader = reader
+        self.cache_size = cache_size
+        base_count = len(reader) if reader else 0
+        self._rows = array('q', range(base_count))
+        self._added = []
+        self._edited = {}
+        self._cache = OrderedDict()
+        self._positions = {}
+        self._stale_from = 0
+        self.library_index = LibraryIndex()
+        self.query_index = None
+        self.similarity_index = None
+        self.listeners = []
+        if reader:
+            self.library_index.by_path = dict(zip(reader.column('file_path'), range(base_count)))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add_listener(self, listener: CatalogListener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: CatalogListener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def _load(self, handle):
+        if handle < 0:
+            return self._added[-handle - 1]
+        if handle in self._edited:
+            return self._edited[handle]
+        return self.reader.song(handle)
+
+    def _get(self, handle):
+        song = self._cache.get(handle)
+        if song is not None:
+            self._cache.move_to_end(handle)
+            return song
+        song = self._load(handle)
+        self._cache[handle] = song
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return song
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._get(self._rows[i]) for i in range(*position.indices(len(self)))]
+        return self._get(self._rows[position])
+
+    def __iter__(self):
+        for handle in self._rows:
+            yield self._cache.get(handle) or self._load(handle)
+
+    def page(self, start, count):
+        return self[start:start + count]
+
+    def _refresh_positions(self):
+        start = self._stale_from
+        self._positions.update(zip(self._rows[start:], range(start, len(self._rows))))
+        self._stale_from = len(self._rows)
+
+    def index(self, file_path):
+        handle = self.library_index.get(file_path)
+        if handle is None:
+            return -1
+        position = self._positions.get(handle)
+        if position is None or position >= self._stale_from:
+            self._refresh_positions()
+            position = self._positions[handle]
+        return position
+
+    def get(self, file_path):
+        handle = self.library_index.get(file_path)
+        return self._get(handle) if handle is not None else None
+
+    def keys(self):
+        return self.library_index.by_path.keys()
+
+    def __contains__(self, file_path):
+        return file_path in self.library_index
+
+    def _text_entries(self):
+        columns = {}
+        if self.reader:
+            columns = {name: self.reader.column(name) for name in ('file_path', 'title', 'artist', 'album')}
+        for handle in self._rows:
+            if handle >= 0 and handle not in self._edited:
+                yield (columns['file_path'][handle], columns['title'][handle],
+                       columns['artist'][handle], columns['album'][handle])
+            else:
+                song = self._load(handle)
+                yield song.file_path, song.title, song.artist, song.album
+
+    def _text_handles(self, query):
+        if not self.library_index.text_ready:
+            self.library_index.build_text(self._text_entries())
+        by_path = self.library_index.by_path
+        return [by_path[path] for path in self.library_index.search(query)]
+
+    def _query_index(self):
+        if self.query_index is None:
+            from QueryEngine import QueryIndex
+            self.query_index = QueryIndex.build(self.reader, self._rows, self._edited, self._added)
+        return self.query_index
+
+    def select(self, expression, limit=None, candidates=None):
+        handles = self._query_index().select(expression, candidates)
+        return [self._cache.get(handle) or self._load(handle) for handle in handles[:limit]]
+
+    def similar(self, song: Song, k=10):
+        if self.similarity_index is None:
+            from SimilarityIndex import SimilarityIndex
+            self.similarity_index = SimilarityIndex.build(self._query_index())
+        handle = self.library_index.get(song.file_path)
+        handles = self.similarity_index.nearest(song, k, () if handle is None else (handle,))
+        return [self._cache.get(handle) or self._load(handle) for handle in handles]
+
+    def search(self, query, limit=None):
+        if ":" in query:
+            from QueryEngine import parse
+            expression, query = parse(query)
+            if expression is not None:
+                return self.select(expression, limit, self._text_handles(query) if query else None)
+        order = self._text_handles(query)
+        order = [handle if handle >= 0 else ADDED_ORDER - handle for handle in order]
+        if limit is not None and limit < len(order):
+            order = heapq.nsmallest(limit, order)
+        else:
+            order.sort()
+        handles = [key if key < ADDED_ORDER else ADDED_ORDER - key for key in order]
+        return [self._cache.get(handle) or self._load(handle) for handle in handles]
+
+    def append(self, song: Song):
+        if song.file_path in self.library_index:
+            self.replace(song.file_path, song)
+            return
+        position = len(self._rows)
+        for listener in self.listeners:
+            listener.begin_insert(position)
+        self._added.append(song)
+        self._rows.append(-len(self._added))
+        if self._stale_from == position:
+            self._positions[self._rows[-1]] = position
+            self._stale_from += 1
+        self.library_index.add_song(song, self._rows[-1])
+        if self.query_index is not None:
+            self.query_index.add_song(song, self._rows[-1])
+        if self.similarity_index is not None:
+            self.similarity_index.add_song(song, self._rows[-1])
+        for listener in self.listeners:
+            listener.end_insert()
+
+    def remove(self, file_path):
+        position = self.index(file_path)
+        if position < 0:
+            return None
+        for listener in self.listeners:
+            listener.begin_remove(position)
+        handle = self._rows.pop(position)
+        self._positions.pop(handle, None)
+        self._stale_from = min(self._stale_from, position)
+        song = self._cache.pop(handle, None) or self._load(handle)
+        self.library_index.remove_song(song)
+        if self.query_index is not None:
+            self.query_index.remove_song(handle)
+        if self.similarity_index is not None:
+            self.similarity_index.remove_song(handle)
+        self._edited.pop(handle, None)
+        if handle < 0:
+            self._added[-handle - 1] = None
+        for listener in self.listeners:
+            listener.end_remove()
+        return song
+
+    def replace(self, file_path, updated_song: Song):
+        position = self.index(file_path)
+        if position < 0:
+            return False
+        handle = self._rows[position]
+        self.library_index.update_song(self._get(handle), updated_song)
+        if self.query_index is not None:
+            self.query_index.update_song(updated_song, handle)
+        if self.similarity_index is not None:
+            self.similarity_index.update_song(updated_song, handle)
+        if handle < 0:
+            self._added[-handle - 1] = updated_song
+        else:
+            self._edited[handle] = updated_song
+        self._cache.pop(handle, None)
+        for listener in self.listeners:
+            listener.row_changed(position)
+        return True
+
+    def close(self):
+        self._cache.clear()
+        if self.reader:
+            self.reader.close()
+            self.reader = None
@@ -0,0 +1,106 @@
+import errno
+import hashlib
+import mmap
+import os
+import shutil
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+FICLONE = 0x40049409
+BUFFER_SIZE = 1 << 20
+
+
+def hash_file(path, buffer_size=BUFFER_SIZE):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= buffer_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, "madvise"):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                digest.update(mapped)
+        else:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def reflink(src, dst):
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        return False
+
+
+def kernel_copy(src, dst, size):
+    copy = getattr(os, "copy_file_range", None)
+    if copy is None and hasattr(os, "sendfile"):
+        copy = lambda src_fd, dst_fd, count: os.sendfile(dst_fd, src_fd, None, count)
+    if copy is None:
+        return 0
+    copied = 0
+    try:
+        while copied < size:
+            sent = copy(src.fileno(), dst.fileno(), min(size - copied, 1 << 30))
+            if sent == 0:
+                break
+            copied += sent
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP):
+            raise
+        if copied:
+            src.seek(copied)
+            dst.seek(copied)
+        return copied
+    return copied
+
+
+def copy_blob(source, dest):
+    directory = os.path.dirname(dest)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with open(source, "rb") as src, os.fdopen(fd, "wb") as dst:
+            size = os.fstat(src.fileno()).st_size
+            if not reflink(src, dst) and kernel_copy(src, dst, size) < size:
+                shutil.copyfileobj(src, dst, BUFFER_SIZE)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, dest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class SongStore():
+    def __init__(self, root="data/songs"):
+        self.root = root
+
+    def blob_path(self, digest, ext=""):
+        return f"{self.root}/{digest[:2]}/{digest}{ext.lower()}"
+
+    def is_blob(self, path):
+        name = os.path.splitext(os.path.basename(path))[0]
+        return len(name) == 64 and os.path.basename(os.path.dirname(path)) == name[:2]
+
+    def put(self, source):
+        digest = hash_file(source)
+        dest = self.blob_path(digest, os.path.splitext(source)[1])
+        if os.path.exists(dest):
+            return dest, False
+        copy_blob(source, dest)
+        return dest, True
+
+    def remove(self, path):
+        if os.path.exists(path):
+            os.remove(path)
+            try:
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass
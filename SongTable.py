@@ -0,0 +1,148 @@
+import math
+from array import array
+from Song import Song, as_float
+
+CODED_COLUMNS = ['artist', 'album', 'genre']
+STRING_COLUMNS = ['file_path', 'title', 'cover_url', 'cover_path']
+FLOAT_COLUMNS = ['duration', 'bpm']
+
+
+class Vocabulary():
+    def __init__(self, values=None):
+        self.values = []
+        self.codes = {}
+        for value in values or []:
+            self.code(value)
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+
+class SongRow():
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    file_path = property(lambda self: self.table.file_path[self.index])
+    title = property(lambda self: self.table.title[self.index])
+    cover_url = property(lambda self: self.table.cover_url[self.index])
+    cover_path = property(lambda self: self.table.cover_path[self.index])
+    duration = property(lambda self: self.table.duration[self.index])
+    bpm = property(lambda self: self.table.bpm[self.index])
+    artist = property(lambda self: self.table.value('artist', self.index))
+    album = property(lambda self: self.table.value('album', self.index))
+    genre = property(lambda self: self.table.value('genre', self.index))
+
+    def to_song(self) -> Song:
+        return self.table.song(self.index)
+
+    def __repr__(self):
+        return f"SongRow({self.index}, {self.title!r}, {self.artist!r})"
+
+
+class SongTable():
+    def __init__(self):
+        self.file_path = []
+        self.title = []
+        self.cover_url = []
+        self.cover_path = []
+        self.duration = array('d')
+        self.bpm = array('d')
+        self.codes = {name: array('I') for name in CODED_COLUMNS}
+        self.vocab = {name: Vocabulary() for name in CODED_COLUMNS}
+
+    @classmethod
+    def from_rows(cls, rows) -> 'SongTable':
+        table = cls()
+        for row in rows:
+            table.append_row(row)
+        return table
+
+    @classmethod
+    def from_songs(cls, songs) -> 'SongTable':
+        return cls.from_rows(song.to_dict() for song in songs)
+
+    def __len__(self):
+        return len(self.file_path)
+
+    def __getitem__(self, index) -> SongRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return SongRow(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield SongRow(self, index)
+
+    def value(self, name, index):
+        return self.vocab[name].values[self.codes[name][index]]
+
+    def append_row(self, row: dict):
+        self.file_path.append(row['file_path'])
+        self.title.append(row.get('title') or "")
+        self.cover_url.append(row.get('cover_url') or None)
+        self.cover_path.append(row.get('cover_path') or "assets/placeholder_cover.png")
+        self.duration.append(as_float(row.get('duration')))
+        self.bpm.append(as_float(row.get('bpm')))
+        for name in CODED_COLUMNS:
+            self.codes[name].append(self.vocab[name].code(row.get(name) or ""))
+
+    def append(self, song: Song):
+        self.append_row(song.to_dict())
+
+    def set_song(self, index, song: Song):
+        self.file_path[index] = song.file_path
+        self.title[index] = song.title
+        self.cover_url[index] = song.cover_url
+        self.cover_path[index] = song.cover_path
+        self.duration[index] = as_float(song.duration)
+        self.bpm[index] = as_float(song.bpm)
+        for name in CODED_COLUMNS:
+            self.codes[name][index] = self.vocab[name].code(getattr(song, name))
+
+    def song(self, index) -> Song:
+        return Song(
+            file_path=self.file_path[index],
+            title=self.title[index],
+            artist=self.value('artist', index),
+            album=self.value('album', index),
+            genre=self.value('genre', index),
+            duration=self.duration[index],
+            cover_url=self.cover_url[index],
+            cover_path=self.cover_path[index],
+            bpm=self.bpm[index]
+        )
+
+    def songs(self):
+        return [self.song(index) for index in range(len(self))]
+
+    def total_duration(self, indices=None):
+        if indices is None:
+            return math.fsum(self.duration)
+        return math.fsum(map(self.duration.__getitem__, indices))
+
+    def mean_bpm(self, indices=None):
+        count = len(self) if indices is None else len(indices)
+        if not count:
+            return 0.0
+        if indices is None:
+            return math.fsum(self.bpm) / count
+        return math.fsum(map(self.bpm.__getitem__, indices)) / count
+
+    def where(self, name, value):
+        code = self.vocab[name].codes.get(value)
+        if code is None:
+            return []
+        return [index for index, c in enumerate(self.codes[name]) if c == code]
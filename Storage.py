@@ -1,46 +1,191 @@
 import os
-from Song import Song
+from SQLiteCatalog import SQLiteCatalog
+from CatalogSnapshot import open_snapshot, write_snapshot, source_stamp
+from SongCatalog import SongCatalog
+from CassetteStore import CassetteStore
+from Metrics import timed
 import json
+import re
+
+ENGINES = ("json", "sqlite")
+SEPARATORS = re.compile(r'[\s,]*')
+
+def iter_json_array(path, chunk_size=1 << 16):
+    decoder = json.JSONDecoder()
+    with open(path, 'r') as f:
+        buffer = f.read(chunk_size)
+        position = SEPARATORS.match(buffer).end()
+        if buffer[position:position + 1] != '[':
+            raise ValueError(f"{path} is not a JSON array")
+        position += 1
+        eof = False
+        while True:
+            position = SEPARATORS.match(buffer, position).end()
+            if buffer.startswith(']', position):
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield item
 
 class Storage():
-    def __init__(self):
-      self.songs_file = "data/songs.json"
-      os.makedirs("data", exist_ok=True)
+    def __init__(self, engine="json", data_dir="data"):
+      if engine not in ENGINES:
+          raise ValueError(f"Unknown storage engine: {engine}")
+      self.engine = engine
+      self.data_dir = data_dir
+      self.songs_file = os.path.join(data_dir, "songs.json")
+      self.db_file = os.path.join(data_dir, "songs.db")
+      self.snapshot_file = os.path.join(data_dir, "songs.snapshot")
+      self.cassettes_dir = os.path.join(data_dir, "cassettes")
+      os.makedirs(data_dir, exist_ok=True)
+      self.catalog = None
+      if engine == "sqlite":
+          self.catalog = SQLiteCatalog(self.db_file)
+          if os.path.exists(self.songs_file):
+              self.catalog.migrate_from_json(self.songs_file)
 
-    def load_songs(self):
-      loaded_songs = []
+    def source_file(self):
+      return self.db_file if self.catalog else self.songs_file
+
+    def iter_rows(self):
+      if self.catalog:
+          yield from self.catalog.iter_rows()
+          return
       try:
-          with open(self.songs_file, 'r') as f:
-              loaded_songs = json.load(f)
+          yield from iter_json_array(self.songs_file)
       except FileNotFoundError:
           print("Missing data/songs.json")
-      return [Song.from_dict(song) for song in loaded_songs]
 
+    @timed("storage.write_snapshot")
+    def write_snapshot(self):
+      stamp = source_stamp(self.source_file())
+      return write_snapshot(self.snapshot_file, self.iter_rows(), stamp)
+
+    @timed("storage.open_snapshot")
+    def open_snapshot(self):
+      stamp = source_stamp(self.source_file())
+      reader = open_snapshot(self.snapshot_file, stamp)
+      if reader is None:
+          write_snapshot(self.snapshot_file, self.iter_rows(), stamp)
+          reader = open_snapshot(self.snapshot_file, stamp)
+      return reader
+
+    @timed("storage.load_songs")
+    def load_songs(self):
+      reader = self.open_snapshot()
+      try:
+          return reader.songs()
+      finally:
+          reader.close()
+
+    def load_table(self):
+      reader = self.open_snapshot()
+      try:
+          return reader.to_table()
+      finally:
+          reader.close()
+
+    @timed("storage.open_catalog")
+    def open_catalog(self, cache_size=256):
+      return SongCatalog(self.open_snapshot(), cache_size)
+
+    def open_cassettes(self):
+      return CassetteStore(self.cassettes_dir)
+
+    @timed("storage.save_songs")
     def save_songs(self, songs):
+      if self.catalog:
+          self.catalog.replace_all(songs)
+          return
       songs_to_json = [song.to_dict() for song in songs]
       with open(self.songs_file, 'w') as f:
           json.dump(songs_to_json, f, indent=4)
-    
+
+    @timed("storage.add_song")
     def add_song(self, song):
+      if self.catalog:
+          self.catalog.add_song(song)
+          return
       try:
         with open(self.songs_file, "r") as file:
           song_list = json.load(file)
       except FileNotFoundError:
-        song_list  = [] 
+        song_list  = []
       song_list.append(song.to_dict())
       with open(self.songs_file, "w") as f:
         json.dump(song_list, f, indent=4)
 
-    def delete_song(self, deleted_song, songs):
-        updated_songs = [s for s in songs if s.file_path != deleted_song.file_path]
-        self.save_songs(updated_songs)
+    @timed("storage.add_songs")
+    def add_songs(self, songs):
+      if self.catalog:
+          self.catalog.add_songs(songs)
+          return
+      new_paths = {song.file_path for song in songs}
+      rows = [row for row in self.iter_rows() if row['file_path'] not in new_paths]
+      self.save_rows(rows + [song.to_dict() for song in songs])
+
+    @timed("storage.save_rows")
+    def save_rows(self, rows):
+      rows = list(rows)
+      with open(self.songs_file, 'w') as f:
+          json.dump(rows, f, indent=4)
+
+    def remove_file(self, song):
         try:
-            if os.path.exists(deleted_song.file_path):
-                os.remove(deleted_song.file_path)
+            if os.path.exists(song.file_path):
+                os.remove(song.file_path)
         except Exception as e:
             print(f"Warning: Could not delete audio file: {e}")
+
+    @timed("storage.remove_song")
+    def remove_song(self, deleted_song):
+        if self.catalog:
+            self.catalog.delete_song(deleted_song.file_path)
+        else:
+            self.save_rows(row for row in self.iter_rows()
+                           if row['file_path'] != deleted_song.file_path)
+        self.remove_file(deleted_song)
+
+    @timed("storage.replace_song")
+    def replace_song(self, file_path, updated_song):
+        if self.catalog:
+            self.catalog.update_song(file_path, updated_song)
+        else:
+            self.save_rows(updated_song.to_dict() if row['file_path'] == file_path else row
+                           for row in self.iter_rows())
+
+    @timed("storage.update_analysis")
+    def update_analysis(self, results):
+        if self.catalog:
+            self.catalog.update_analysis(results)
+            return
+        analysis = {file_path: (duration, bpm) for file_path, duration, bpm in results}
+
+        def patched(row):
+            if row['file_path'] in analysis:
+                row['duration'], row['bpm'] = analysis[row['file_path']]
+            return row
+        self.save_rows(patched(row) for row in self.iter_rows())
+
+    @timed("storage.delete_song")
+    def delete_song(self, deleted_song, songs):
+        updated_songs = [s for s in songs if s.file_path != deleted_song.file_path]
+        if self.catalog:
+            self.catalog.delete_song(deleted_song.file_path)
+        else:
+            self.save_songs(updated_songs)
+        self.remove_file(deleted_song)
         return updated_songs
-    
+
+    @timed("storage.update_song")
     def update_song(self, og_song, updated_song, songs):
         updated_songs = []
         for song in songs:
@@ -48,6 +193,16 @@ class Storage():
                 updated_songs.append(updated_song)
             else:
                 updated_songs.append(song)
-        self.save_songs(updated_songs)
+        if self.catalog:
+            self.catalog.update_song(og_song.file_path, updated_song)
+        else:
+            self.save_songs(updated_songs)
         return updated_songs
-    
\ No newline at end of file
+
+    def export_json(self, json_file=None):
+      json_file = json_file or self.songs_file
+      if self.catalog:
+          self.catalog.export_json(json_file)
+      else:
+          self.save_songs(self.load_songs())
+      return json_file
@@ -0,0 +1,121 @@
+import itertools
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import zmq
+import Metrics
+
+
+class ZmqClient():
+    def __init__(self, endpoint, timeout=5.0, context=None):
+        self.endpoint = endpoint
+        self.metric = "zmq." + endpoint.rsplit(":", 1)[-1]
+        self.timeout = timeout
+        self.context = context or zmq.Context.instance()
+        self.ids = itertools.count(1)
+        self.outbox = queue.Queue()
+        self.pending = {}
+        self.closed = False
+        self.wake_address = f"inproc://zmq-client-{id(self)}"
+        self.wake_lock = threading.Lock()
+        self.wake_receiver = self.context.socket(zmq.PAIR)
+        self.wake_receiver.bind(self.wake_address)
+        self.wake_sender = self.context.socket(zmq.PAIR)
+        self.wake_sender.connect(self.wake_address)
+        self.socket = None
+        self.thread = threading.Thread(target=self._run, name=f"zmq-{endpoint}", daemon=True)
+        self.thread.start()
+
+    def request(self, payload, timeout=None) -> Future:
+        future = Future()
+        if self.closed:
+            future.set_result({"error": "Microservice client closed"})
+            return future
+        request_id = next(self.ids)
+        deadline = time.monotonic() + (timeout or self.timeout)
+        self.outbox.put((request_id, payload, future, deadline))
+        self._wake()
+        return future
+
+    def _wake(self):
+        with self.wake_lock:
+            try:
+                self.wake_sender.send(b"", zmq.NOBLOCK)
+            except zmq.Again:
+                pass
+
+    def call(self, payload, timeout=None) -> dict:
+        return self.request(payload, timeout).result()
+
+    def _connect(self):
+        if self.socket is not None:
+            self.socket.close(linger=0)
+        self.socket = self.context.socket(zmq.DEALER)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.connect(self.endpoint)
+
+    def _fail_pending(self, message):
+        for future, _, _ in self.pending.values():
+            if not future.done():
+                future.set_result({"error": message})
+        self.pending.clear()
+
+    def _run(self):
+        self._connect()
+        poller = zmq.Poller()
+        poller.register(self.wake_receiver, zmq.POLLIN)
+        poller.register(self.socket, zmq.POLLIN)
+        while not self.closed:
+            now = time.monotonic()
+            wait = None
+            if self.pending:
+                wait = max(0, min(deadline for _, deadline, _ in self.pending.values()) - now)
+            events = dict(poller.poll(None if wait is None else int(wait * 1000) + 1))
+
+            if self.wake_receiver in events:
+                while self.wake_receiver.poll(0):
+                    self.wake_receiver.recv()
+                while True:
+                    try:
+                        request_id, payload, future, deadline = self.outbox.get_nowait()
+                    except queue.Empty:
+                        break
+                    self.pending[request_id] = (future, deadline, time.perf_counter())
+                    self.socket.send_multipart([str(request_id).encode(), b"",
+                                                json.dumps(payload).encode("utf-8")])
+
+            if self.socket in events:
+                while self.socket.poll(0):
+                    frames = self.socket.recv_multipart()
+                    try:
+                        request_id = int(frames[0])
+                        response = json.loads(frames[-1])
+                    except (ValueError, IndexError):
+                        continue
+                    entry = self.pending.pop(request_id, None)
+                    if entry and not entry[0].done():
+                        Metrics.record(self.metric, time.perf_counter() - entry[2])
+                        entry[0].set_result(response)
+
+            now = time.monotonic()
+            if any(deadline <= now for _, deadline, _ in self.pending.values()):
+                Metrics.record(self.metric + ".timeout", self.timeout, pending=len(self.pending))
+                self._fail_pending("Microservice timeout")
+                poller.unregister(self.socket)
+                self._connect()
+                poller.register(self.socket, zmq.POLLIN)
+
+        self._fail_pending("Microservice client closed")
+        self.socket.close(linger=0)
+        self.wake_receiver.close(linger=0)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._wake()
+        self.thread.join(timeout=1)
+        with self.wake_lock:
+            self.wake_sender.close(linger=0)
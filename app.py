@@ -1,32 +1,87 @@
+import time
+STARTED = time.perf_counter()
 import sys
 import os
+from functools import cached_property
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QPushButton, QStackedWidget,
-                             QFileDialog, QTextEdit, QScrollArea, QListWidget, 
-                             QListWidgetItem, QLineEdit, QMessageBox)
-from PyQt5.QtCore import Qt
+                             QFileDialog, QTextEdit, QScrollArea,
+                             QLineEdit, QMessageBox, QListView)
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QObject, QEvent, QTimer, pyqtSignal
 from PyQt5.QtGui import QPixmap, QFont, QKeyEvent
-import pygame
-import shutil
 from Song import Song
 from Storage import Storage
-from MusicPlayer import MusicPlayer
-import json
-import zmq
-import requests
+import Metrics
+from Metrics import timed
+from SongCatalog import CatalogListener
+from CoverCache import CoverCache, LIST_SIZE, PLAYER_SIZE
+import threading
 
 
 LARGEFONT = QFont("Verdana", 30)
 
+class FutureRelay(QObject):
+    resolved = pyqtSignal(object, object)
+
+    def __init__(self):
+        super().__init__()
+        self.resolved.connect(lambda callback, value: callback(value))
+
+    def watch(self, future, callback):
+        future.add_done_callback(lambda f: self.resolved.emit(callback, f.result()))
+
+
+class FirstPaintProbe(QObject):
+    def __init__(self, callback):
+        super().__init__()
+        self.callback = callback
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and self.callback:
+            callback, self.callback = self.callback, None
+            QTimer.singleShot(0, callback)
+        return False
+
+
+class ImportPipeline(QObject):
+    stage = pyqtSignal(str, str, str)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str, str)
+    bulk_progress = pyqtSignal(int, int)
+    bulk_finished = pyqtSignal(object)
+
+    def __init__(self, importer, bulk_importer=None):
+        super().__init__()
+        self.importer = importer
+        self.bulk_importer = bulk_importer
+
+    def import_directory(self, root):
+        def run():
+            report = self.bulk_importer.run(root, lambda done, total, path: self.bulk_progress.emit(done, total))
+            self.bulk_finished.emit(report)
+        threading.Thread(target=run, name="bulk-import", daemon=True).start()
+
+    def import_file(self, source, title="", artist=""):
+        future = self.importer.import_file(source, title, artist, self.stage.emit)
+        future.add_done_callback(lambda f: self._done(source, f))
+        return future
+
+    def _done(self, source, future):
+        try:
+            self.finished.emit(future.result())
+        except FileNotFoundError:
+            self.failed.emit(source, "Source file not found.")
+        except Exception as e:
+            self.failed.emit(source, str(e))
+
+
 class CassetteApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Cassette Archive")
         self.setFixedSize(400,500)
-        self.storage = Storage()
-        self.music_player = MusicPlayer(self.storage)
-        print(self.music_player.songs)
-        self.setup_zmq_client()
+        self.storage = Storage(engine="sqlite")
+        self.relay = FutureRelay()
 
         
         self.setStyleSheet("""
@@ -58,73 +113,99 @@ class CassetteApp(QMainWindow):
         self.stk = QStackedWidget()
         main_layout.addWidget(self.stk)
         
+        self.page_types = {'start': StartPage, 'addsong': AddSong, 'playsong': PlaySong,
+                           'songview': SongView, 'help': HelpPage}
         self.pages = {}
-        self.pages['start'] = StartPage(self)
-        self.pages['addsong'] = AddSong(self)
-        self.pages['playsong'] = PlaySong(self)
-        self.pages['songview'] = SongView(self)
-        self.pages['help'] = HelpPage(self)
-        
-        for _, page in self.pages.items():
-            self.stk.addWidget(page)
-        
         self.show_page('start')
-    
-    def show_page(self, pgName):
-        if pgName in self.pages:
-            self.stk.setCurrentWidget(self.pages[pgName])
-    def setup_zmq_client(self):
-        try:
-            self.zmq_context = zmq.Context()
-            self.zmq_5555 = self.zmq_context.socket(zmq.REQ)
-            self.zmq_4000 = self.zmq_context.socket(zmq.REQ)
-            self.zmq_5555.connect("tcp://localhost:5555") 
-            self.zmq_4000.connect("tcp://localhost:4000")   
-            print("ZeroMQ client connected to microservice")
-        except Exception as e:
-            print(f"Failed to setup ZeroMQ client: {e}")
-            self.zmq_socket = None
 
+    @cached_property
+    def music_player(self):
+        from MusicPlayer import MusicPlayer
+        player = MusicPlayer(self.storage)
+        if 'services' in self.__dict__:
+            self.request_shuffle_seed(player)
+        return player
+
+    @cached_property
+    def scheduler(self):
+        from PlaybackScheduler import PlaybackScheduler
+        return PlaybackScheduler(self.music_player)
+
+    @cached_property
+    def cover_cache(self):
+        return CoverCache()
+
+    @cached_property
+    def services(self):
+        from Microservices import Microservices
+        from ResponseCache import ResponseCache, CachedServices
+        services = CachedServices(Microservices(), ResponseCache())
+        if 'music_player' in self.__dict__:
+            self.request_shuffle_seed(self.music_player, services)
+        return services
+
+    @cached_property
+    def analyzer(self):
+        from AudioAnalysis import LocalAnalyzer
+        return LocalAnalyzer()
+
+    @cached_property
+    def import_pipeline(self):
+        from Importer import Importer
+        from BulkImport import BulkImporter
+        known = self.music_player.songs.__contains__
+        pipeline = ImportPipeline(Importer(self.services, analyzer=self.analyzer, known=known),
+                                  BulkImporter(self.services, analyzer=self.analyzer, known=known))
+        pipeline.finished.connect(self.on_song_imported)
+        pipeline.bulk_finished.connect(self.on_bulk_imported)
+        return pipeline
+
+    def warm_up(self):
+        with Metrics.span("startup.warm_up"):
+            self.services
+            player = self.music_player
+        threading.Thread(target=player.ensure_mixer, name="mixer-init", daemon=True).start()
+
+    def shutdown(self):
+        if 'analyzer' in self.__dict__:
+            self.analyzer.shutdown()
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
+
+    def page(self, name):
+        page = self.pages.get(name)
+        if page is None and name in self.page_types:
+            with Metrics.span(f"page.build.{name}"):
+                page = self.pages[name] = self.page_types[name](self)
+                self.stk.addWidget(page)
+        return page
+
+    @timed("page.show")
+    def show_page(self, pgName):
+        page = self.page(pgName)
+        if page is not None:
+            self.stk.setCurrentWidget(page)
     def get_song_info(self, song_name: str, artist_name: str) -> dict:
-        if not self.zmq_5555:
-            return {"error": "Song Microservice not available"}
-        
-        try:
-            # Send request to microservice
-            request = {
-                "type": "song",
-                "song": song_name,
-                "artist": artist_name
-            }
-            self.zmq_5555.send_json(request)
-            
-            # Receive response
-            response = self.zmq_5555.recv_json()
-            print("response received")
-            return response.get("playlist", [{}])[0]  # Get first result
-            
-        except zmq.Again:
-            return {"error": "Microservice timeout"}
-        except Exception as e:
-            return {"error": f"Microservice error: {str(e)}"}
+        return self.services.get_song_info(song_name, artist_name)
+
     def get_random_num(self, max):
-        if not self.zmq_4000:
-            return {"error": "RNG Microservice not available"}
-        
-        try:
-            request = {
-                "method": "rand",
-                "params": {"min": 0, "max": max}
-            }
-            self.zmq_4000.send_json(request)
-            response = self.zmq_4000.recv_json()
-            print("response received")
-            return response
-            
-        except zmq.Again:
-            return {"error": "Microservice timeout"}
-        except Exception as e:
-            return {"error": f"Microservice error: {str(e)}"}
+        return self.services.get_random_num(max)
+
+    def request_shuffle_seed(self, player, services=None):
+        services = services or self.services
+        self.relay.watch(services.get_entropy_async(), player.seed_shuffle)
+
+    def on_song_imported(self, song):
+        self.music_player.add_song(song)
+
+    def on_bulk_imported(self, report):
+        self.music_player.add_songs(report.imported)
+        print(report.summary())
+        for path, error in report.failures:
+            print(f"Failed to import {path}: {error}")
+
     def nav_layout(self, nav_layout):
         song_view = QPushButton("Song View")
         song_view.clicked.connect(lambda: self.show_page('songview'))
@@ -218,6 +299,10 @@ class AddSong(QWidget):
         self.import_button.clicked.connect(self.import_file)
         layout.addWidget(self.import_button)
 
+        self.folder_button = QPushButton("Import Folder")
+        self.folder_button.clicked.connect(self.import_folder)
+        layout.addWidget(self.folder_button)
+
         l2 = QHBoxLayout()
 
         cancel = QPushButton("Cancel")
@@ -228,6 +313,18 @@ class AddSong(QWidget):
         add_song = QPushButton("Confirm")
         add_song.clicked.connect(self.add_song)
         l2.addWidget(add_song)
+
+        self.status_label = QLabel("")
+        self.status_label.setWordWrap(True)
+        self.status_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.status_label)
+
+        pipeline = self.parent.import_pipeline
+        pipeline.stage.connect(self.on_stage)
+        pipeline.finished.connect(self.on_finished)
+        pipeline.failed.connect(self.on_failed)
+        pipeline.bulk_progress.connect(self.on_bulk_progress)
+        pipeline.bulk_finished.connect(self.on_bulk_finished)
         
         self.setLayout(layout)
 
@@ -243,103 +340,43 @@ class AddSong(QWidget):
             self.file_path = file_path
         self.import_button.setStyleSheet("background-color: #DEBE64;")
 
-    def call_spotify_microservice(self):
-        song_name = self.song_name.toPlainText()
-        artist_name = self.artist_name.toPlainText()
-        song_info = self.parent.get_song_info(song_name, artist_name)
-        if "error" in song_info:
-            print(f"Error: {song_info['error']}")
-            return
-        else:
-            self.song_name.setText(song_info.get("name", song_name))
-            self.artist_name.setText(song_info.get("artist", artist_name))
-            self.microservice_data = song_info
-    
-    def call_audio_microservice(self, file, song):
-        file_path = os.path.abspath(file)
-        response = requests.get(
-            "http://localhost:5002/audio-analysis",
-            json={"file_path": file_path}
-        )
-        result = response.json()
-        try:
-            if result["status"] == "success":
-                song.bpm = result['bpm']
-                song.duration = result['duration']
-                return
-        except requests.exceptions.ConnectionError:
-            print("Can't connect to microservice")
-        except Exception as e:
-            print(f"Test failed with error: {e}")
-
-    def call_image_microservice(self, song):
-        os.makedirs('data/covers', exist_ok=True)
-        if not song.cover_url:
-            return
-        song_path = f"data/covers/{song.title}_{song.artist}.jpeg"
-        url = song.cover_url
-        response = requests.post(
-            "http://localhost:5001/api/cover/process",
-            json={"image_url": url, "size": 200}
-        )
-        result = response.json()
-
-        try:
-            if result["status"] == "success":
-                print("Processing successful")
-                print(f"Dimensions: {result['dimensions']}")
-                print(f"Format: {result['format']}")
-                image_data = bytes.fromhex(result["image_data"])
-                with open(song_path, "wb") as f:
-                    f.write(image_data)
-                print("Saved as: song_path.jpeg")
-                song.cover_path = song_path
-            else:
-                print("Processing failed")
-                print(f"Error: {result.get('message')}")
-        except requests.exceptions.ConnectionError:
-            print("Can't connect to microservice")
-        except Exception as e:
-            print(f"Test failed with error: {e}")
-
     def add_song(self):
         if self.file_path:
-            source = self.file_path
-            file_name = os.path.basename(source)
-            dest_path = 'data/songs'
-            os.makedirs(dest_path, exist_ok=True)
-            try:
-                shutil.copy(source, dest_path)
-                print(f"File '{source}' successfully copied to '{dest_path}'")
-                title = self.song_name.toPlainText()
-                artist = self.artist_name.toPlainText()
-                print("attempting to call song microservice")
-                self.call_spotify_microservice()
-                print("attempting to make song object")
-                if hasattr(self, 'microservice_data'):
-                    new_song = Song.from_microservice_data(
-                        f"data/songs/{file_name}", 
-                        self.microservice_data
-                    )
-                else:
-                    new_song = Song(f"data/songs/{file_name}", title, artist)
-                print("attempting to call image microservice")
-                self.call_image_microservice(new_song)
-                print("attempting to call audio microservice")
-                self.call_audio_microservice(source, new_song)
-                self.parent.music_player.add_song(new_song)
-                self.parent.storage.add_song(new_song)
-                self.file_path = None
-                self.song_name.clear()
-                self.artist_name.clear()
-                self.import_button.setStyleSheet("background-color: #FFDB78;")
-            except FileNotFoundError:
-                print(f"Error: Source file not found.")
-            except Exception as e:
-                print(f"An error occurred: {e}")
+            title = self.song_name.toPlainText()
+            artist = self.artist_name.toPlainText()
+            self.status_label.setText(f"Importing {os.path.basename(self.file_path)}...")
+            self.parent.import_pipeline.import_file(self.file_path, title, artist)
+            self.file_path = None
+            self.song_name.clear()
+            self.artist_name.clear()
+            self.import_button.setStyleSheet("background-color: #FFDB78;")
         else:
             print("No file selected, please retry")
 
+    def import_folder(self):
+        root = QFileDialog.getExistingDirectory(self, "Select Music Folder")
+        if root:
+            self.folder_button.setEnabled(False)
+            self.status_label.setText(f"Scanning {root}...")
+            self.parent.import_pipeline.import_directory(root)
+
+    def on_bulk_progress(self, done, total):
+        self.status_label.setText(f"Imported {done} of {total} files")
+
+    def on_bulk_finished(self, report):
+        self.folder_button.setEnabled(True)
+        self.status_label.setText(report.summary())
+
+    def on_stage(self, source, stage, status):
+        self.status_label.setText(f"{os.path.basename(source)}: {stage} {status}")
+
+    def on_finished(self, song):
+        self.status_label.setText(f"Added '{song.title}' by {song.artist}")
+
+    def on_failed(self, source, message):
+        print(f"An error occurred: {message}")
+        self.status_label.setText(f"Import failed: {message}")
+
     def cancel(self):
         self.file_path = None
         self.song_name.clear()
@@ -380,6 +417,10 @@ class PlaySong(QWidget):
             self.image_label.setText("Image not found")
         self.image_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.image_label)
+
+        self.position_label = QLabel("0:00")
+        self.position_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.position_label)
         
         
         self.edit_layout = QVBoxLayout()
@@ -414,6 +455,12 @@ class PlaySong(QWidget):
         self.skip_button.setText("Skip")
         self.skip_button.clicked.connect(self.skip_current_song)
         controls_layout.addWidget(self.skip_button)
+
+        self.similar_button = QPushButton("Similar")
+        self.similar_button.setCheckable(True)
+        self.similar_button.setToolTip("Skip to a track close in tempo and genre instead of a random one")
+        self.similar_button.toggled.connect(self.toggle_similar_mode)
+        controls_layout.addWidget(self.similar_button)
         layout.addLayout(controls_layout)
         
         
@@ -440,7 +487,31 @@ class PlaySong(QWidget):
         layout.addLayout(update_layout)
         
         self.setLayout(layout)
+        self.parent.cover_cache.ready.connect(self.on_cover_ready)
+        self.parent.scheduler.track_changed.connect(self.on_track_changed)
+        self.parent.scheduler.state_changed.connect(self.on_state_changed)
+        self.parent.scheduler.position_changed.connect(self.on_position_changed)
+        self.update_display()
+
+    def on_track_changed(self, song):
         self.update_display()
+
+    def on_state_changed(self, status):
+        self.play_button.setText("Pause" if status == "playing" else "Play")
+
+    def on_position_changed(self, position, progress):
+        song = self.parent.music_player.current_song
+        elapsed = f"{int(position) // 60}:{int(position) % 60:02d}"
+        if song and song.duration:
+            total = int(song.duration)
+            self.position_label.setText(f"{elapsed} / {total // 60}:{total % 60:02d}")
+        else:
+            self.position_label.setText(elapsed)
+
+    def on_cover_ready(self, source, size):
+        song = self.parent.music_player.current_song
+        if size == PLAYER_SIZE and song and song.cover_path == source:
+            self.update_display()
     
     def toggle_edit_mode(self):
         self.edit_mode = not self.edit_mode
@@ -501,15 +572,11 @@ class PlaySong(QWidget):
             
             if reply == QMessageBox.Yes:
                 self.parent.music_player.delete_current_song()
+                self.parent.scheduler.sync()
                 self.parent.show_page('songview')
 
     def play_current_song(self):
-        if self.parent.music_player.status == "paused" or self.parent.music_player.status == "stopped":
-            self.play_button.setText("Pause")
-            self.parent.music_player.play()
-        elif self.parent.music_player.status == "playing":
-            self.play_button.setText("Play")
-            self.parent.music_player.pause()
+        self.parent.scheduler.toggle()
         self.update_display()
 
     def keyPressEvent(self, event):
@@ -520,6 +587,7 @@ class PlaySong(QWidget):
         else:
             super().keyPressEvent(event)
             
+    @timed("page.playsong.update_display")
     def update_display(self):
         player = self.parent.music_player
         
@@ -533,11 +601,9 @@ class PlaySong(QWidget):
                          f"Genre: {song.genre}", f"Length: {song.duration}", f"BPM: {song.bpm}"]
                 display_text = "\n".join(stats)
                 self.song_info.setText(display_text)
-                self.image_pixmap = QPixmap(song.cover_path)
+                self.image_pixmap = self.parent.cover_cache.pixmap(song.cover_path, PLAYER_SIZE)
                 if not self.image_pixmap.isNull():
                     self.image_label.setPixmap(self.image_pixmap)
-                else:
-                    self.image_pixmap = QPixmap("assets/placeholder_cover.png")
         else:
             self.song_info.setText("No song loaded")
     
@@ -546,16 +612,95 @@ class PlaySong(QWidget):
         self.update_display()
 
     def skip_current_song(self):
-        rand_num = self.parent.get_random_num(self.parent.music_player.playlist_length -1)
-        while self.parent.music_player.songs[int(rand_num)].file_path ==  self.parent.music_player.current_song.file_path:
-            rand_num = self.parent.get_random_num(self.parent.music_player.playlist_length -1)
-        self.status = "stopped"
-        self.parent.music_player.load_song(self.parent.music_player.songs[int(rand_num)])
-        self.play_current_song()
-        self.update_display()
+        self.parent.scheduler.skip()
+
+    def toggle_similar_mode(self, checked):
+        self.parent.music_player.set_skip_mode("similar" if checked else "shuffle")
 
    
 
+class SongListModel(QAbstractListModel, CatalogListener):
+    def __init__(self, catalog, cover_cache=None, search_limit=500):
+        super().__init__()
+        self.catalog = catalog
+        self.cover_cache = cover_cache
+        self.search_limit = search_limit
+        self.query = ""
+        self.results = None
+        catalog.add_listener(self)
+        if cover_cache:
+            cover_cache.ready.connect(self.on_cover_ready)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self.results is not None:
+            return len(self.results)
+        return len(self.catalog)
+
+    def song_at(self, row):
+        if self.results is not None:
+            return self.catalog.get(self.results[row])
+        return self.catalog[row]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.rowCount():
+            return None
+        song = self.song_at(index.row())
+        if song is None:
+            return None
+        if role == Qt.DisplayRole:
+            return f"{song.title} - {song.artist}"
+        if role == Qt.UserRole:
+            return song.file_path
+        if role == Qt.DecorationRole and self.cover_cache:
+            return self.cover_cache.pixmap(song.cover_path, LIST_SIZE)
+        return None
+
+    def on_cover_ready(self, source, size):
+        if size == LIST_SIZE and self.rowCount():
+            self.dataChanged.emit(self.index(0), self.index(self.rowCount() - 1), [Qt.DecorationRole])
+
+    def set_query(self, query):
+        self.beginResetModel()
+        self.query = query.strip()
+        if self.query:
+            try:
+                self.results = [s.file_path for s in self.catalog.search(self.query, self.search_limit)]
+            except ValueError:
+                self.results = []
+        else:
+            self.results = None
+        self.endResetModel()
+
+    def begin_insert(self, position):
+        if self.results is None:
+            self.beginInsertRows(QModelIndex(), position, position)
+
+    def end_insert(self):
+        if self.results is None:
+            self.endInsertRows()
+        else:
+            self.set_query(self.query)
+
+    def begin_remove(self, position):
+        if self.results is None:
+            self.beginRemoveRows(QModelIndex(), position, position)
+
+    def end_remove(self):
+        if self.results is None:
+            self.endRemoveRows()
+        else:
+            self.set_query(self.query)
+
+    def row_changed(self, position):
+        if self.results is None:
+            index = self.index(position)
+            self.dataChanged.emit(index, index)
+        else:
+            self.set_query(self.query)
+
+
 class SongView(QWidget):
     def __init__(self, parent):
         super().__init__()
@@ -575,31 +720,35 @@ class SongView(QWidget):
         self.parent.nav_layout(nav_layout)
         
         layout.addLayout(nav_layout)
-        self.song_list = QListWidget()
+
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search title, artist or album, or filter with bpm:120..130 duration:<4:00 genre:pop")
+        self.search_box.textChanged.connect(self.refresh_list)
+        layout.addWidget(self.search_box)
+
+        self.model = SongListModel(self.parent.music_player.songs, self.parent.cover_cache)
+        self.song_list = QListView()
+        self.song_list.setUniformItemSizes(True)
+        self.song_list.setIconSize(QSize(LIST_SIZE, LIST_SIZE))
+        self.song_list.setModel(self.model)
+        self.song_list.clicked.connect(self.on_item_clicked)
         layout.addWidget(self.song_list)
         self.setLayout(layout)
-        self.refresh_list()
 
+    @timed("page.songview.refresh_list")
     def refresh_list(self):
-        self.song_list.clear()
-        for s in self.parent.music_player.songs:
-            item = QListWidgetItem(f"{s.title} - {s.artist}")
-            item.setData(Qt.UserRole, s)
-            self.song_list.addItem(item)
-        self.song_list.itemClicked.connect(self.on_item_clicked)
-
-    def on_item_clicked(self, item):
-        selected = item.data(Qt.UserRole)
+        self.model.set_query(self.search_box.text())
+
+    def on_item_clicked(self, index):
+        selected = self.parent.music_player.songs.get(index.data(Qt.UserRole))
+        if selected is None:
+            return
         current = self.parent.music_player.current_song
         if (current and current.file_path == selected.file_path):
             self.parent.show_page('playsong')
         else:
-            self.parent.music_player.load_song(selected)
+            self.parent.scheduler.load(selected)
             self.parent.show_page('playsong')
-    
-    def showEvent(self, event):
-        super().showEvent(event)
-        self.refresh_list()
 
 class HelpPage(QWidget):
     def __init__(self, parent):
@@ -635,12 +784,35 @@ class HelpPage(QWidget):
 
     
 
+def report_startup(imported, constructed, profile):
+    painted = time.perf_counter()
+    Metrics.record("startup.imports", imported - STARTED)
+    Metrics.record("startup.window", constructed - imported)
+    Metrics.record("startup.first_paint", painted - STARTED)
+    if profile:
+        print(f"imports {(imported - STARTED) * 1000:.1f} ms, window {(constructed - imported) * 1000:.1f} ms, "
+              f"first paint {(painted - STARTED) * 1000:.1f} ms")
+
+
 if __name__ == "__main__":
+    profile = "--profile-startup" in sys.argv
+    imported = time.perf_counter()
     app = QApplication(sys.argv)
     
     app.setFont(QFont("Verdana", 10))
     
     window = CassetteApp()
+    constructed = time.perf_counter()
+
+    def first_paint():
+        app.removeEventFilter(probe)
+        report_startup(imported, constructed, profile)
+        if profile:
+            app.quit()
+        else:
+            QTimer.singleShot(0, window.warm_up)
+    probe = FirstPaintProbe(first_paint)
+    app.installEventFilter(probe)
     window.show()
     
     sys.exit(app.exec_())
@@ -0,0 +1,101 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from AudioAnalysis import LocalAnalyzer
+from ServiceClient import ServiceClient
+from Song import Song
+from Storage import Storage
+from stub_services import start_http_stub
+
+
+def write_click_track(path, bpm, seconds, rate=22050, seed=361):
+    rng = np.random.default_rng(seed)
+    signal = rng.normal(0, 0.01, int(seconds * rate)).astype(np.float32)
+    click = np.sin(np.arange(400) * 2 * np.pi * 1000 / rate) * np.exp(-np.arange(400) / 100)
+    for start in (np.arange(0, seconds, 60 / bpm) * rate).astype(int):
+        end = min(start + len(click), len(signal))
+        signal[start:end] += click[:end - start]
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes((np.clip(signal, -1, 1) * 32000).astype(np.int16).tobytes())
+
+
+def write_library(root, tracks, seconds):
+    data_dir = os.path.join(root, "data")
+    storage = Storage("sqlite", data_dir)
+    songs = []
+    tempos = {}
+    for i in range(tracks):
+        path = os.path.join(root, f"click_{i:04d}.wav")
+        tempos[path] = 70 + (i * 7) % 90
+        write_click_track(path, tempos[path], seconds, seed=i)
+        songs.append(Song(path, f"Click {i}", "Bench"))
+    storage.add_songs(songs)
+    return storage, tempos
+
+
+def remote_calls(client, paths):
+    for path in paths:
+        client.get("/audio-analysis", {"file_path": path})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare local audio analysis with the remote analysis service")
+    parser.add_argument("--tracks", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--remote-url", default=None)
+    parser.add_argument("--port", type=int, default=15003)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="cassette-analysis-")
+    server = None
+    try:
+        storage, tempos = write_library(root, args.tracks, args.seconds)
+        paths = list(tempos)
+
+        rows = []
+        for workers in sorted({1, args.workers}):
+            analyzer = LocalAnalyzer(max_workers=workers)
+            analyzer.analyze_audio(paths[0])
+            storage.update_analysis([(path, 0.0, 0.0) for path in paths])
+            report = analyzer.analyze_library(storage)
+            analyzer.shutdown()
+            errors = [abs(bpm - tempos[path]) for path, _, bpm in report.analysed]
+            within = sum(error < 2 for error in errors)
+            rows.append((f"local x{workers}", report.elapsed, report.throughput,
+                         f"{within}/{len(paths)} within 2 BPM"))
+
+        base_url = args.remote_url
+        if not base_url:
+            server = start_http_stub(args.port, args.latency)
+            base_url = f"http://127.0.0.1:{args.port}"
+        client = ServiceClient(base_url)
+        start = time.perf_counter()
+        remote_calls(client, paths)
+        elapsed = time.perf_counter() - start
+        client.close()
+        rows.append(("remote service", elapsed, len(paths) / elapsed, base_url))
+
+        print(f"{args.tracks} tracks of {args.seconds:.0f}s")
+        for name, elapsed, throughput, note in rows:
+            print(f"  {name:<16} {elapsed * 1000:9.1f} ms {throughput:8.1f} tracks/s  {note}")
+    finally:
+        if server:
+            server.shutdown()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
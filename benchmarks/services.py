@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from ServiceClient import ServiceClient
+from stub_services import start_http_stub
+
+
+def bare_calls(base_url, paths):
+    for path in paths:
+        requests.get(f"{base_url}/audio-analysis", json={"file_path": path}).json()
+
+
+def pooled_calls(client, paths):
+    for path in paths:
+        client.get("/audio-analysis", {"file_path": path})
+
+
+def pooled_concurrent(client, paths, workers):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda path: client.get("/audio-analysis", {"file_path": path}), paths))
+
+
+def batched_calls(client, paths, batch_size):
+    for start in range(0, len(paths), batch_size):
+        client.post("/audio-analysis/batch", {"file_paths": paths[start:start + batch_size]})
+
+
+def timed(name, fn, count, results):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    results.append((name, elapsed, count / elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark service client call paths against a local stub")
+    parser.add_argument("--port", type=int, default=15002)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    server = start_http_stub(args.port, args.latency)
+    base_url = f"http://127.0.0.1:{args.port}"
+    client = ServiceClient(base_url, pool_size=args.workers)
+    paths = [f"/music/track_{i}.mp3" for i in range(args.calls)]
+
+    results = []
+    timed("bare requests.get", lambda: bare_calls(base_url, paths), args.calls, results)
+    timed("pooled session", lambda: pooled_calls(client, paths), args.calls, results)
+    timed(f"pooled x{args.workers} threads", lambda: pooled_concurrent(client, paths, args.workers),
+          args.calls, results)
+    timed(f"batch of {args.batch_size}", lambda: batched_calls(client, paths, args.batch_size),
+          args.calls, results)
+
+    print(f"{args.calls} analysis calls, {args.latency * 1000:.0f} ms stub latency")
+    for name, elapsed, throughput in results:
+        print(f"  {name:<22} {elapsed * 1000:9.1f} ms {throughput:9.1f} calls/s")
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
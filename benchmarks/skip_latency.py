@@ -0,0 +1,110 @@
+import argparse
+import math
+import os
+import shutil
+import statistics
+import struct
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from Song import Song
+from Storage import Storage
+from MusicPlayer import MusicPlayer
+
+
+def write_tone(path, seconds, frequency, rate=44100):
+    frame = struct.Struct("<hh")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        step = 2 * math.pi * frequency / rate
+        frames = bytearray()
+        for i in range(int(seconds * rate)):
+            sample = int(8000 * math.sin(i * step))
+            frames += frame.pack(sample, sample)
+        f.writeframes(bytes(frames))
+
+
+def drop_cache(path):
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def first_audio(player, timeout=2.0):
+    start = time.perf_counter()
+    song = player.skip()
+    while pygame.mixer.music.get_pos() <= 0:
+        if time.perf_counter() - start > timeout:
+            break
+        time.sleep(0.0002)
+    return song, time.perf_counter() - start
+
+
+def measure(player, skips, preload, settle):
+    samples = []
+    for _ in range(skips):
+        if not preload:
+            player.preloaded = {}
+            player.upcoming = None
+        upcoming = player.shuffle.peek(player.current_song.file_path if player.current_song else None)
+        if upcoming:
+            drop_cache(upcoming)
+        if preload:
+            player.preload_next()
+            time.sleep(settle)
+        _, elapsed = first_audio(player)
+        samples.append(elapsed)
+        pygame.mixer.music.stop()
+        player.status = "stopped"
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure skip-to-first-audio latency with and without preloading")
+    parser.add_argument("--tracks", type=int, default=12)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--skips", type=int, default=20)
+    parser.add_argument("--settle", type=float, default=0.2)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="cassette-skip-")
+    try:
+        data_dir = os.path.join(root, "data")
+        storage = Storage("sqlite", data_dir)
+        songs = []
+        for i in range(args.tracks):
+            path = os.path.join(root, f"tone_{i:03d}.wav")
+            write_tone(path, args.seconds, 220 + 20 * i)
+            songs.append(Song(path, f"Tone {i}", "Bench", "", "", args.seconds, None,
+                              "assets/placeholder_cover.png", 0))
+        storage.add_songs(songs)
+        player = MusicPlayer(storage)
+        player.seed_shuffle(361)
+
+        cold = measure(player, args.skips, False, args.settle)
+        warm = measure(player, args.skips, True, args.settle)
+        print(f"{args.skips} skips over {args.tracks} tracks of {args.seconds:.0f}s WAV")
+        for name, samples in (("load on skip", cold), ("preloaded", warm)):
+            print(f"  {name:<14} median {statistics.median(samples) * 1000:7.2f} ms"
+                  f"  max {max(samples) * 1000:7.2f} ms")
+        player.loader.shutdown()
+        pygame.mixer.quit()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
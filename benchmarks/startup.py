@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Storage import Storage
+
+GENRES = ["k-pop", "latin", "bedroom pop", "indie", "hip hop", "jazz", "", "rock"]
+
+
+def synthetic_rows(count, seed=361):
+    rng = random.Random(seed)
+    for i in range(count):
+        artist = f"Artist {rng.randrange(count // 10 + 1)}"
+        yield {
+            "file_path": f"data/songs/track_{i:07d}.mp3",
+            "title": f"Track {i}",
+            "artist": artist,
+            "album": f"Album {rng.randrange(count // 5 + 1)}",
+            "genre": rng.choice(GENRES),
+            "duration": f"{rng.uniform(90, 420):.2f}",
+            "cover_url": None,
+            "cover_path": "assets/placeholder_cover.png",
+            "bpm": f"{rng.uniform(60, 200):.2f}",
+        }
+
+
+def write_library(data_dir, count):
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, "songs.json"), "w") as f:
+        json.dump(list(synthetic_rows(count)), f, indent=4)
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(count, repeat):
+    root = tempfile.mkdtemp(prefix="cassette-startup-")
+    try:
+        data_dir = os.path.join(root, "data")
+        write_library(data_dir, count)
+
+        def json_parse():
+            with open(os.path.join(data_dir, "songs.json")) as f:
+                from Song import Song
+                [Song.from_dict(row) for row in json.load(f)]
+
+        json_storage = Storage("json", data_dir)
+        sqlite_storage = Storage("sqlite", data_dir)
+
+        results = {}
+        results["json parse (baseline)"] = timed(json_parse, repeat)
+        results["sqlite load_songs"] = timed(sqlite_storage.catalog.load_songs, repeat)
+        sqlite_storage.write_snapshot()
+        results["snapshot load_songs"] = timed(sqlite_storage.load_songs, repeat)
+        results["snapshot map only"] = timed(lambda: sqlite_storage.open_snapshot().close(), repeat)
+        json_storage.write_snapshot()
+        results["json snapshot rebuild"] = timed(json_storage.write_snapshot, 1)
+        return results
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare catalog startup paths")
+    parser.add_argument("--songs", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = run(args.songs, args.repeat)
+    print(f"{args.songs} songs, best of {args.repeat}")
+    for name, seconds in results.items():
+        print(f"  {name:<24} {seconds * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
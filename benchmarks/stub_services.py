@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COVER_BYTES = bytes(range(256)) * 64
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.02
+
+    def log_message(self, format, *args):
+        pass
+
+    def _payload(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _reply(self, body, status=200):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _analysis(self, file_path):
+        rng = random.Random(file_path)
+        return {"status": "success", "file_path": file_path,
+                "bpm": f"{rng.uniform(60, 200):.2f}", "duration": f"{rng.uniform(90, 420):.2f}"}
+
+    def do_GET(self):
+        payload = self._payload()
+        time.sleep(self.latency)
+        if self.path == "/audio-analysis":
+            self._reply(self._analysis(payload.get("file_path", "")))
+        else:
+            self._reply({"status": "error", "message": "not found"}, 404)
+
+    def do_POST(self):
+        payload = self._payload()
+        time.sleep(self.latency)
+        if self.path == "/audio-analysis/batch":
+            results = [self._analysis(path) for path in payload.get("file_paths", [])]
+            self._reply({"status": "success", "results": results})
+        elif self.path == "/api/cover/process":
+            size = payload.get("size", 200)
+            self._reply({"status": "success", "dimensions": [size, size], "format": "JPEG",
+                         "image_data": COVER_BYTES.hex()})
+        else:
+            self._reply({"status": "error", "message": "not found"}, 404)
+
+
+def start_http_stub(port, latency=0.02):
+    handler = type("Handler", (StubHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def zmq_reply(request, rng):
+    if request.get("type") == "song":
+        return {"playlist": [{"name": request.get("song") or "Stub Song",
+                              "artist": request.get("artist") or "Stub Artist",
+                              "album": "Stub Album", "genres": ["indie"], "image": None}]}
+    if request.get("method") == "rand":
+        params = request.get("params", {})
+        return {"result": rng.randint(params.get("min", 0), max(params.get("min", 0), params.get("max", 0)))}
+    return {"error": "unknown request"}
+
+
+class ZmqStub():
+    def __init__(self, port, latency=0.0):
+        import zmq
+        self.port = port
+        self.latency = latency
+        self.socket = zmq.Context.instance().socket(zmq.ROUTER)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.bind(f"tcp://127.0.0.1:{port}")
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        rng = random.Random(self.port)
+        try:
+            while not self.stopped.is_set():
+                if not self.socket.poll(100):
+                    continue
+                frames = self.socket.recv_multipart()
+                time.sleep(self.latency)
+                reply = zmq_reply(json.loads(frames[-1]), rng)
+                self.socket.send_multipart(frames[:-1] + [json.dumps(reply).encode("utf-8")])
+        finally:
+            self.socket.close()
+
+    def shutdown(self):
+        self.stopped.set()
+        self.thread.join()
+
+
+def start_zmq_stub(port, latency=0.0):
+    return ZmqStub(port, latency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-ins for the cover and audio services")
+    parser.add_argument("--cover-port", type=int, default=5001)
+    parser.add_argument("--audio-port", type=int, default=5002)
+    parser.add_argument("--song-port", type=int, default=5555)
+    parser.add_argument("--rng-port", type=int, default=4000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+    start_http_stub(args.cover_port, args.latency)
+    start_http_stub(args.audio_port, args.latency)
+    start_zmq_stub(args.song_port, args.latency)
+    start_zmq_stub(args.rng_port, args.latency)
+    print(f"Stub services on :{args.cover_port}, :{args.audio_port}, :{args.song_port} and "
+          f":{args.rng_port} (pid {os.getpid()})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
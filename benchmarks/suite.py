@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from Cassette import Cassette, SmartCassette
+from QueryEngine import parse
+from Song import Song
+from Storage import Storage
+from startup import write_library
+from stub_services import start_http_stub, start_zmq_stub
+
+
+def measure(fn, repeat=3, setup=None):
+    samples = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        fn(state) if setup else fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {"best": samples[0], "median": samples[len(samples) // 2], "runs": len(samples)}
+
+
+def new_song(i):
+    return Song(f"data/songs/bench_{i:07d}.mp3", f"Bench {i}", "Bench Artist", duration=180.0, bpm=120.0)
+
+
+def storage_benchmarks(data_dir, engine, repeat):
+    storage = Storage(engine, data_dir)
+    songs = storage.load_songs()
+    middle = songs[len(songs) // 2]
+    edited = Song(middle.file_path, middle.title + " (edit)", middle.artist, middle.album,
+                  middle.genre, middle.duration, middle.cover_url, middle.cover_path, middle.bpm)
+    counter = iter(range(10 ** 9))
+
+    def stored_song():
+        song = new_song(next(counter))
+        storage.add_song(song)
+        return song
+
+    results = {
+        "load_songs": measure(storage.load_songs, repeat),
+        "save_songs": measure(lambda: storage.save_songs(songs), repeat),
+        "add_song": measure(lambda: storage.add_song(new_song(next(counter))), repeat),
+        "update_song": measure(lambda: storage.update_song(middle, edited, songs), repeat),
+        "replace_song": measure(lambda: storage.replace_song(middle.file_path, middle), repeat),
+        "delete_song": measure(lambda song: storage.delete_song(song, songs), repeat, setup=stored_song),
+    }
+    if storage.catalog:
+        storage.catalog.close()
+    return results
+
+
+def cassette_benchmarks(songs, repeat):
+    tracks = songs[:10_000]
+
+    def build():
+        cassette = Cassette("bench", [])
+        for song in tracks:
+            cassette.add_song(song)
+        return cassette
+
+    cassette = build()
+    keys = [song.file_path for song in tracks]
+    return {
+        "tracks": len(tracks),
+        "build": measure(build, repeat),
+        "membership": measure(lambda: [song in cassette for song in tracks], repeat),
+        "total_duration": measure(cassette.total_duration, repeat),
+        "move_front_half": measure(lambda: cassette.move(keys[-1], len(keys) // 2), repeat),
+        "reorder_reverse": measure(lambda: cassette.reorder(reversed(list(cassette.songs))), repeat),
+        "remove_add": measure(lambda: [cassette.add_song(cassette.remove_song(song) or song)
+                                       for song in tracks[:1000]], repeat),
+    }
+
+
+def query_benchmarks(data_dir, repeat):
+    catalog = Storage("json", data_dir).open_catalog()
+    query = 'genre:k-pop bpm:120..130 duration:<4:00'
+    expression, _ = parse(query)
+    smart = SmartCassette("bench", [], query=query)
+    edited = catalog[len(catalog) // 2]
+    results = {
+        "build_index": measure(lambda: (setattr(catalog, "query_index", None), catalog.select(expression)), repeat),
+        "mask": measure(lambda: catalog.query_index.select(expression), repeat),
+        "select": measure(lambda: catalog.select(expression), repeat),
+        "search_and_filter": measure(lambda: catalog.search("track 4 " + query), repeat),
+        "smart_attach": measure(lambda: smart.attach(catalog), repeat),
+        "smart_row_changed": measure(lambda: catalog.replace(edited.file_path, edited), repeat),
+        "similar_build": measure(lambda: (setattr(catalog, "similarity_index", None), catalog.similar(edited)), repeat),
+        "similar_k10": measure(lambda: catalog.similar(edited, 10), repeat),
+    }
+    catalog.close()
+    return results
+
+
+def qt_benchmarks(repeat):
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    import app as cassette_app
+
+    window = cassette_app.CassetteApp()
+    window.show()
+    app.processEvents()
+    song_view = window.page('songview')
+    play_song = window.page('playsong')
+    player = window.music_player
+    player.current_song = player.songs[len(player.songs) // 2]
+
+    def refresh(query):
+        song_view.search_box.setText(query)
+        song_view.refresh_list()
+        app.processEvents()
+
+    def timed_refresh(query):
+        return measure(lambda _: refresh(query), repeat, setup=lambda: refresh("no such song"))
+
+    def update_display():
+        play_song.update_display()
+        app.processEvents()
+
+    results = {
+        "refresh_list_all": timed_refresh(""),
+        "refresh_list_selective": timed_refresh("track 4242"),
+        "refresh_list_prefix": timed_refresh("tr"),
+        "update_display": measure(update_display, repeat),
+    }
+    window.shutdown()
+    window.close()
+    return results
+
+
+def run_size(count, repeat, engines, qt):
+    root = tempfile.mkdtemp(prefix=f"cassette-bench-{count}-")
+    cwd = os.getcwd()
+    try:
+        data_dir = os.path.join(root, "data")
+        start = time.perf_counter()
+        write_library(data_dir, count)
+        results = {"generate": time.perf_counter() - start}
+        pristine = os.path.join(root, "songs.json")
+        shutil.copy(os.path.join(data_dir, "songs.json"), pristine)
+
+        for engine in engines:
+            engine_dir = os.path.join(root, engine)
+            os.makedirs(engine_dir)
+            shutil.copy(pristine, os.path.join(engine_dir, "songs.json"))
+            results[f"storage_{engine}"] = storage_benchmarks(engine_dir, engine, repeat)
+
+        results["cassette"] = cassette_benchmarks(Storage("json", data_dir).load_songs(), repeat)
+        results["query"] = query_benchmarks(data_dir, repeat)
+
+        if qt:
+            os.symlink(os.path.join(ROOT, "assets"), os.path.join(root, "assets"))
+            os.chdir(root)
+            results["qt"] = qt_benchmarks(repeat)
+        return results
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results, prefix=""):
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and "best" in value:
+            yield name, value["best"]
+        elif isinstance(value, dict):
+            yield from flatten(value, name + ".")
+
+
+def compare(current, previous_file, threshold):
+    with open(previous_file) as f:
+        previous = json.load(f)
+    before = dict(flatten(previous["results"]))
+    print(f"Compared with {previous_file} ({previous.get('revision')})")
+    for name, seconds in flatten(current["results"]):
+        if name not in before or not before[name]:
+            continue
+        ratio = seconds / before[name]
+        flag = "  REGRESSION" if ratio > 1 + threshold and seconds - before[name] > 1e-4 else ""
+        print(f"  {name:<48} {before[name] * 1000:10.2f} -> {seconds * 1000:10.2f} ms  x{ratio:5.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks for storage, cassettes, queries and the Qt views")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engines", default="json,sqlite")
+    parser.add_argument("--no-qt", action="store_true")
+    parser.add_argument("--output", default=os.path.join(ROOT, "bench_results.json"))
+    parser.add_argument("--compare", default=None)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    servers = []
+    if not args.no_qt:
+        servers = [start_http_stub(5001, 0.0), start_http_stub(5002, 0.0),
+                   start_zmq_stub(5555), start_zmq_stub(4000)]
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": {},
+    }
+    try:
+        for count in (int(size) for size in args.sizes.split(",")):
+            repeat = args.repeat if count <= 100_000 else 1
+            print(f"{count} songs...", flush=True)
+            report["results"][str(count)] = run_size(count, repeat, args.engines.split(","), not args.no_qt)
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    for name, seconds in flatten(report["results"]):
+        print(f"  {name:<48} {seconds * 1000:10.2f} ms")
+    print(f"Wrote {args.output}")
+    if args.compare:
+        compare(report, args.compare, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import json
+import os
+import sys
+import time
+from LibraryEngine import LibraryEngine
+
+
+class Progress():
+    def __init__(self, label, as_json=False, interval=0.5):
+        self.label = label
+        self.as_json = as_json
+        self.interval = interval
+        self.last = 0.0
+        self.start = time.perf_counter()
+
+    def __call__(self, done, total, path):
+        now = time.perf_counter()
+        if done < total and now - self.last < self.interval:
+            return
+        self.last = now
+        rate = done / (now - self.start) if now > self.start else 0.0
+        if self.as_json:
+            print(json.dumps({"task": self.label, "done": done, "total": total, "path": path,
+                              "rate": round(rate, 2)}), file=sys.stderr, flush=True)
+        else:
+            print(f"\r{self.label}: {done}/{total} ({rate:.1f}/s)", end="\n" if done == total else "",
+                  file=sys.stderr, flush=True)
+
+
+def report_failures(report):
+    print(report.summary())
+    for path, error in report.failures:
+        print(f"  {path}: {error}")
+    return 1 if report.failures else 0
+
+
+def run_import(engine, args):
+    paths = args.paths[0] if len(args.paths) == 1 and os.path.isdir(args.paths[0]) else args.paths
+    return report_failures(engine.import_paths(paths, Progress("import", args.json)))
+
+
+def run_reanalyze(engine, args):
+    return report_failures(engine.reanalyze(missing_only=not args.all, progress=Progress("reanalyze", args.json)))
+
+
+def run_refetch_covers(engine, args):
+    return report_failures(engine.refetch_covers(force=args.force, progress=Progress("covers", args.json)))
+
+
+def run_query(engine, args):
+    try:
+        songs = engine.query(args.expression, args.limit, save_as=args.save)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    for song in songs:
+        print(f"{song.title} - {song.artist}  [{song.genre}, {song.bpm:.1f} bpm, {song.duration:.0f}s]")
+    print(f"{len(songs)} songs" + (f" saved as smart cassette {args.save!r}" if args.save else ""))
+    return 0
+
+
+def run_export(engine, args):
+    print(f"Exported library to {engine.export(args.output)}")
+    return 0
+
+
+def run_vacuum(engine, args):
+    orphans, freed = engine.vacuum(dry_run=args.dry_run)
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"{verb} {len(orphans)} orphaned files ({freed / (1 << 20):.1f} MiB)")
+    for path in orphans if args.dry_run else []:
+        print(f"  {path}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless Cassette Archive library maintenance")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--engine", default="sqlite", choices=("json", "sqlite"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--json", action="store_true", help="stream progress as JSON lines on stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="import audio files or a folder")
+    importer.add_argument("paths", nargs="+")
+    importer.set_defaults(run=run_import)
+
+    reanalyze = commands.add_parser("reanalyze", help="compute bpm and duration locally")
+    reanalyze.add_argument("--all", action="store_true", help="reanalyze songs that already have values")
+    reanalyze.set_defaults(run=run_reanalyze)
+
+    covers = commands.add_parser("refetch-covers", help="download covers that are missing on disk")
+    covers.add_argument("--force", action="store_true", help="refetch every cover, bypassing the cache")
+    covers.set_defaults(run=run_refetch_covers)
+
+    query = commands.add_parser("query", help="list songs matching a filter such as 'genre:k-pop bpm:120..130'")
+    query.add_argument("expression")
+    query.add_argument("--limit", type=int, default=None)
+    query.add_argument("--save", metavar="NAME", help="save the filter as a smart cassette")
+    query.set_defaults(run=run_query)
+
+    export = commands.add_parser("export", help="write the library as songs.json")
+    export.add_argument("output")
+    export.set_defaults(run=run_export)
+
+    vacuum = commands.add_parser("vacuum", help="drop orphaned audio blobs and compact databases")
+    vacuum.add_argument("--dry-run", action="store_true")
+    vacuum.set_defaults(run=run_vacuum)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    engine = LibraryEngine(data_dir=args.data_dir, engine=args.engine, workers=args.workers)
+    try:
+        return args.run(engine, args)
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import pytest
+from Cassette import Cassette
+from CassetteStore import CassetteStore
+from Song import Song
+from SongCatalog import SongCatalog
+
+
+def song(i, duration=100.0):
+    return Song(f"songs/{i}.mp3", f"Track {i}", "Artist", duration=duration)
+
+
+def keys(cassette):
+    return list(cassette.songs)
+
+
+def test_running_total_follows_adds_and_removes():
+    cassette = Cassette("mix", [song(0, 60), song(1, 90)])
+    assert cassette.total_duration() == 150
+    cassette.add_song(song(2, 30), note="opener")
+    cassette.add_song(song(2, 30))
+    assert cassette.total_duration() == 180 and len(cassette) == 3
+    assert cassette.get_note(song(2)) == "opener"
+    assert cassette.remove_song(song(2).file_path).duration == 30
+    assert cassette.remove_song(song(2)) is None
+    assert cassette.total_duration() == 150 and cassette.notes == {}
+
+
+def test_move_and_reorder():
+    cassette = Cassette("mix", [song(i) for i in range(5)])
+    cassette.move(song(4), 1)
+    assert keys(cassette) == [f"songs/{i}.mp3" for i in (0, 4, 1, 2, 3)]
+    cassette.move_to_end(song(0).file_path)
+    assert keys(cassette)[-1] == "songs/0.mp3"
+    cassette.reorder(reversed(keys(cassette)))
+    assert keys(cassette) == [f"songs/{i}.mp3" for i in (0, 3, 2, 1, 4)]
+    with pytest.raises(ValueError):
+        cassette.reorder(keys(cassette)[:-1])
+    with pytest.raises(KeyError):
+        cassette.move("songs/missing.mp3", 0)
+
+
+def test_attached_cassette_tracks_catalog_edits_and_removals():
+    catalog = SongCatalog()
+    for i in range(4):
+        catalog.append(song(i))
+    cassette = Cassette.from_dict({"name": "mix", "songs": ["songs/1.mp3", "songs/3.mp3", "songs/gone.mp3"],
+                                   "notes": {"songs/3.mp3": "closer", "songs/gone.mp3": "x"}}, catalog)
+    cassette.attach(catalog)
+    assert keys(cassette) == ["songs/1.mp3", "songs/3.mp3"] and cassette.notes == {"songs/3.mp3": "closer"}
+    catalog.replace("songs/1.mp3", song(1, 250))
+    assert cassette.total_duration() == 350
+    catalog.remove("songs/3.mp3")
+    assert keys(cassette) == ["songs/1.mp3"] and cassette.total_duration() == 250
+    assert cassette.to_dict()["songs"] == ["songs/1.mp3"]
+    cassette.detach()
+    catalog.remove("songs/1.mp3")
+    assert len(cassette) == 1
+
+
+def test_loading_does_not_register_listeners(tmp_path):
+    catalog = SongCatalog()
+    for i in range(4):
+        catalog.append(song(i))
+    store = CassetteStore(str(tmp_path))
+    store.save(Cassette("mix", [song(1), song(2)]))
+    store.save(Cassette.from_dict({"name": "long", "songs": [], "query": "duration:>=100"}, catalog))
+    for _ in range(3):
+        store.load("mix", catalog)
+        store.load_all(catalog)
+    assert catalog.listeners == []
+    cassette = store.load("long", catalog)
+    assert len(cassette) == 4
+    cassette.attach(catalog)
+    cassette.attach(catalog)
+    assert len(catalog.listeners) == 1
+    cassette.detach()
+    assert catalog.listeners == []
+
+
+def test_index_accepts_legacy_song_entries(tmp_path):
+    catalog = SongCatalog()
+    for i in range(3):
+        catalog.append(song(i))
+    (tmp_path / "legacy.json").write_text(
+        '{"name": "old", "songs": [{"file_path": "songs/2.mp3"}, "songs/0.mp3", {"file_path": "songs/gone.mp3"}]}')
+    store = CassetteStore(str(tmp_path))
+    store.save(Cassette("new", [song(1)]))
+    headers = store.index(catalog)
+    assert headers["old"]["songs"] == ["songs/2.mp3", "songs/0.mp3"]
+    assert headers["new"]["songs"] == ["songs/1.mp3"]
+    assert keys(store.resolve(headers["old"], catalog)) == ["songs/2.mp3", "songs/0.mp3"]
@@ -0,0 +1,34 @@
+import os
+from LibraryEngine import LibraryEngine
+from Song import Song
+from SongStore import SongStore
+from Storage import Storage
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_vacuum_keeps_referenced_blobs_with_absolute_data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = SongStore("data/songs")
+    live, _ = store.put(write(tmp_path / "a.wav", b"RIFF live"))
+    orphan, _ = store.put(write(tmp_path / "b.wav", b"RIFF orphan"))
+    storage = Storage("sqlite", "data")
+    storage.add_song(Song(live, "Live", "Artist"))
+    storage.catalog.close()
+
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    engine = LibraryEngine(data_dir=str(tmp_path / "data"))
+    try:
+        orphans, _ = engine.vacuum(dry_run=True)
+        assert [os.path.basename(path) for path in orphans] == [os.path.basename(orphan)]
+        engine.vacuum()
+    finally:
+        engine.close()
+    assert (tmp_path / live).exists()
+    assert not (tmp_path / orphan).exists()
@@ -0,0 +1,54 @@
+from LibraryIndex import LibraryIndex, PrefixTrie, tokenize
+from Song import Song
+
+
+def build(songs):
+    index = LibraryIndex()
+    index.build_text((song.file_path, song.title, song.artist, song.album) for song in songs)
+    for handle, song in enumerate(songs):
+        index.by_path[song.file_path] = handle
+    return index
+
+
+def test_tokenize_folds_case_and_accents():
+    assert tokenize("Beyoncé – Halo!") == ["beyonce", "halo"]
+
+
+def test_multi_token_search_intersects_every_token():
+    index = build([Song("a.mp3", "Let It Be", "The Beatles"),
+                   Song("b.mp3", "Be My Baby", "The Ronettes"),
+                   Song("c.mp3", "Yellow Submarine", "The Beatles")])
+    assert index.search("beatles let") == {"a.mp3"}
+    assert index.search("the be") == {"a.mp3", "b.mp3", "c.mp3"}
+    assert index.search("ronettes beatles") == set()
+    assert index.search("") == set()
+
+
+def test_prefix_expansion_is_not_truncated():
+    songs = [Song(f"{i}.mp3", f"b{i:04d}", "Someone") for i in range(400)]
+    songs.append(Song("beatles.mp3", "Hey Jude", "The Beatles"))
+    index = build(songs)
+    assert len(index.search("b")) == 401
+    assert index.search("the b") == {"beatles.mp3"}
+
+
+def test_index_tracks_added_updated_and_removed_songs():
+    index = build([Song("a.mp3", "Halo", "Beyonce")])
+    index.add_song(Song("b.mp3", "Hello", "Adele"), 1)
+    assert index.search("h") == {"a.mp3", "b.mp3"}
+    index.update_song(Song("b.mp3", "Hello", "Adele"), Song("b.mp3", "Rolling", "Adele"))
+    assert index.search("hel") == set()
+    assert index.remove_song(Song("a.mp3", "Halo", "Beyonce")) == 0
+    assert index.search("halo") == set()
+    assert "a.mp3" not in index and "b.mp3" in index
+
+
+def test_trie_remove_prunes_empty_branches():
+    trie = PrefixTrie()
+    for word in ("bee", "beetle", "bear"):
+        trie.add(word)
+    trie.remove("beetle")
+    assert sorted(trie.words("be")) == ["bear", "bee"]
+    trie.remove("bee")
+    trie.remove("bear")
+    assert trie.root == {}
@@ -0,0 +1,17 @@
+import Metrics
+
+
+def test_timed_follows_runtime_enable(monkeypatch):
+    monkeypatch.setattr(Metrics, "ENABLED", False)
+    monkeypatch.setattr(Metrics, "recorder", None)
+
+    @Metrics.timed("test.work")
+    def work(value):
+        return value * 2
+
+    assert work(2) == 4 and Metrics.recorder is None
+    monkeypatch.setattr(Metrics.atexit, "register", lambda fn: None)
+    recorder = Metrics.enable(trace_file=None)
+    assert work(3) == 6
+    assert recorder.snapshot()["test.work"]["count"] == 1
+    recorder.close()
@@ -0,0 +1,16 @@
+from Microservices import entropy_seed, random_number, resolved, chain
+
+
+def test_random_number_unwraps_replies():
+    assert random_number(7) == 7
+    assert random_number({"result": 42}) == 42
+    assert random_number({"number": "9"}) == 9
+
+
+def test_entropy_seed_separates_errors_from_malformed_replies(capsys):
+    assert chain(resolved({"result": 1234}), entropy_seed).result() == 1234
+    assert entropy_seed({"error": "RNG Microservice not available"}) is None
+    assert "unavailable" in capsys.readouterr().out
+    for reply in ({"status": "ok"}, "abc", None, True):
+        assert entropy_seed(reply) is None
+        assert "Malformed RNG reply" in capsys.readouterr().out
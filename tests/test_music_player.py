@@ -0,0 +1,37 @@
+import os
+import pytest
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+import MusicPlayer
+from Song import Song
+from Storage import Storage
+
+
+@pytest.fixture
+def player(tmp_path):
+    storage = Storage("json", str(tmp_path / "data"))
+    songs = [Song(str(tmp_path / f"{name}.mp3"), name, "Artist", duration=1.0) for name in "ABCD"]
+    player = MusicPlayer.MusicPlayer(storage)
+    player.add_songs(songs)
+    yield player
+    player.loader.shutdown()
+    player.library.close()
+
+
+def test_position_restarts_after_each_gapless_transition(player, monkeypatch):
+    pos = {"ms": 0}
+    monkeypatch.setattr(MusicPlayer.pygame.mixer.music, "get_pos", lambda: pos["ms"])
+    player.current_song = player.next_song()
+    player.status = "paused"
+    seen = [player.current_song.file_path]
+    for elapsed in (218, 500):
+        player.preload_next()
+        player.queued = True
+        song = player.advance()
+        assert song is not None and song.file_path not in seen
+        seen.append(song.file_path)
+        pos["ms"] = elapsed
+        assert player.position() == pytest.approx(elapsed / 1000)
+        assert player.progress() == pytest.approx(elapsed / 1000)
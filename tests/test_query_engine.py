@@ -0,0 +1,117 @@
+import random
+import pytest
+from Cassette import Cassette, SmartCassette
+from QueryEngine import All, Field, Genre, Not, Range, parse
+from Song import Song
+from SongCatalog import SongCatalog
+
+GENRES = ["k-pop", "K-Pop, pop", "jazz", "hip hop", "", "Unknown Genre"]
+
+
+def library(count=400, seed=9):
+    rng = random.Random(seed)
+    catalog = SongCatalog()
+    for i in range(count):
+        catalog.append(Song(f"songs/{i}.mp3", f"Track {i}", "Artist", genre=rng.choice(GENRES),
+                            duration=rng.choice([0.0, rng.uniform(60, 400)]),
+                            bpm=rng.choice([0.0, rng.uniform(60, 200)])))
+    return catalog
+
+
+def paths(songs):
+    return [song.file_path for song in songs]
+
+
+def test_parse_splits_filters_from_free_text():
+    expression, text = parse('old school genre:"hip hop" bpm:120..130 duration:<4:00 -genre:jazz')
+    assert text == "old school"
+    assert isinstance(expression, All) and len(expression.terms) == 4
+    genre, bpm, duration, negated = expression.terms
+    assert genre.genres == {"hip hop"}
+    assert (bpm.low, bpm.high) == (120, 130)
+    assert (duration.high, duration.high_open) == (240, True)
+    assert isinstance(negated, Not)
+
+
+def test_parse_number_forms():
+    assert parse("bpm:>=128")[0].low == 128
+    assert parse("bpm:120..")[0].high is None
+    assert parse("duration:..3:30")[0].high == 210
+    exact = parse("bpm:128")[0]
+    assert exact.match(Song("a", "a", "a", bpm=128.4)) and not exact.match(Song("a", "a", "a", bpm=128.5))
+    assert parse("hello world") == (None, "hello world")
+    assert parse("http://example.com")[0] is None
+    for bad in ("bpm:>", "duration:abc", "bpm:1..x"):
+        with pytest.raises(ValueError):
+            parse(bad)
+
+
+@pytest.mark.parametrize("expression", [
+    Range("bpm", 120, 130),
+    Field("duration") < 240,
+    Genre("k-pop"),
+    Genre("pop", "jazz") & (Field("bpm") >= 100),
+    ~Genre("k-pop") | Field("duration").between(100, 200),
+    parse("genre:k-pop bpm:120..130 duration:<4:00")[0],
+])
+def test_vectorized_select_matches_per_song_evaluation(expression):
+    catalog = library()
+    assert paths(catalog.select(expression)) == [song.file_path for song in catalog if expression.match(song)]
+
+
+def test_unanalysed_values_never_match_a_range():
+    catalog = SongCatalog()
+    catalog.append(Song("a.mp3", "A", "X", bpm=0.0, duration=0.0))
+    assert catalog.select(Field("bpm") < 100) == [] and catalog.select(Field("duration") < 100) == []
+
+
+def test_index_follows_catalog_changes():
+    catalog = library()
+    expression = parse("genre:jazz bpm:100..")[0]
+    catalog.select(expression)
+    rng = random.Random(3)
+    for i in range(50):
+        victim = catalog[rng.randrange(len(catalog))]
+        catalog.remove(victim.file_path)
+        target = catalog[rng.randrange(len(catalog))]
+        catalog.replace(target.file_path, Song(target.file_path, "Edited", "X", genre="jazz", bpm=rng.uniform(60, 200)))
+        catalog.append(Song(f"songs/new{i}.mp3", "New", "X", genre=rng.choice(GENRES), bpm=rng.uniform(60, 200)))
+    assert paths(catalog.select(expression)) == [song.file_path for song in catalog if expression.match(song)]
+
+
+def test_search_combines_text_and_filters():
+    catalog = library()
+    found = catalog.search("track 1 genre:jazz", limit=5)
+    assert len(found) <= 5
+    assert all(song.genre == "jazz" and song.title.startswith("Track 1") for song in found)
+    with pytest.raises(ValueError):
+        catalog.search("bpm:>")
+
+
+def test_smart_cassette_updates_only_from_catalog_events():
+    catalog = library()
+    smart = SmartCassette("fast jazz", [], query="genre:jazz bpm:>=140")
+    smart.attach(catalog)
+
+    def expected():
+        return {song.file_path for song in catalog if smart.expression.match(song)}
+
+    assert set(smart.songs) == expected()
+    catalog.append(Song("songs/hit.mp3", "Hit", "X", genre="jazz", bpm=150, duration=100))
+    member = next(iter(smart.songs))
+    catalog.replace(member, Song(member, "Slow", "X", genre="jazz", bpm=90))
+    outsider = next(song for song in catalog if song.file_path not in smart.songs)
+    catalog.replace(outsider.file_path, Song(outsider.file_path, "Fast", "X", genre="jazz", bpm=180, duration=50))
+    catalog.remove(next(iter(smart.songs)))
+    assert set(smart.songs) == expected()
+    assert smart.total_duration() == pytest.approx(sum(catalog.get(key).duration for key in smart.songs))
+
+
+def test_smart_cassette_round_trips_and_rejects_free_text():
+    catalog = library()
+    smart = SmartCassette("k", [], query="genre:k-pop")
+    smart.attach(catalog)
+    restored = Cassette.from_dict(smart.to_dict(), catalog)
+    assert isinstance(restored, SmartCassette) and list(restored.songs) == list(smart.songs)
+    with pytest.raises(ValueError):
+        SmartCassette("bad", [], query="hello bpm:120")
@@ -0,0 +1,54 @@
+from LibraryEngine import LibraryEngine
+from ResponseCache import CachedServices, ResponseCache
+from Song import Song
+from Storage import Storage
+
+
+class CoverServices():
+    def __init__(self):
+        self.calls = 0
+
+    def process_cover(self, url, size=200):
+        self.calls += 1
+        return {"image_data": f"cover {self.calls}".encode("utf-8")}
+
+    def get_song_info(self, song_name, artist_name):
+        self.calls += 1
+        return {"name": song_name, "artist": artist_name}
+
+
+def test_cached_services_serve_repeat_calls_from_cache(tmp_path):
+    services = CoverServices()
+    cached = CachedServices(services, ResponseCache(str(tmp_path / "cache.db")))
+    assert cached.process_cover("http://x/a.jpg") == cached.process_cover("http://x/a.jpg")
+    cached.get_song_info("Halo", "Beyonce")
+    cached.get_song_info("Halo", "Beyonce")
+    assert services.calls == 2
+    cached.cache.close()
+
+
+def test_invalidate_cover_forces_a_fresh_fetch(tmp_path):
+    services = CoverServices()
+    cached = CachedServices(services, ResponseCache(str(tmp_path / "cache.db")))
+    first = cached.process_cover("http://x/a.jpg")
+    cached.invalidate_cover("http://x/a.jpg")
+    second = cached.process_cover("http://x/a.jpg")
+    assert first != second and services.calls == 2
+    assert cached.process_cover("http://x/a.jpg") == second
+    cached.cache.close()
+
+
+def test_forced_cover_refetch_goes_through_the_cache_api(tmp_path):
+    services = CoverServices()
+    cached = CachedServices(services, ResponseCache(str(tmp_path / "cache.db")))
+    storage = Storage("sqlite", str(tmp_path / "data"))
+    storage.add_song(Song("data/songs/a.mp3", "Halo", "Beyonce", cover_url="http://x/a.jpg"))
+    engine = LibraryEngine(storage, services=cached)
+    try:
+        assert len(engine.refetch_covers().imported) == 1
+        assert len(engine.refetch_covers().imported) == 0
+        assert len(engine.refetch_covers(force=True).imported) == 1
+        assert services.calls == 2
+    finally:
+        engine.close()
+        cached.cache.close()
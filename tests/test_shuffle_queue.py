@@ -0,0 +1,69 @@
+from ShuffleQueue import ShuffleQueue
+
+
+def drain(queue, count, current=None):
+    played = []
+    for _ in range(count):
+        current = queue.next(current)
+        played.append(current)
+    return played
+
+
+def test_a_full_pass_plays_every_key_once():
+    keys = [f"song{i}" for i in range(100)]
+    queue = ShuffleQueue(keys, seed=1)
+    played = drain(queue, len(keys))
+    assert sorted(played) == sorted(keys)
+    assert queue.remaining() == 0
+
+
+def test_reshuffle_does_not_repeat_the_last_key():
+    queue = ShuffleQueue(["a", "b", "c"], seed=3)
+    for _ in range(50):
+        last = drain(queue, 3)[-1]
+        assert queue.next(last) != last
+
+
+def test_same_seed_gives_same_order():
+    keys = [f"song{i}" for i in range(20)]
+    assert drain(ShuffleQueue(keys, seed=7), 20) == drain(ShuffleQueue(keys, seed=7), 20)
+
+
+def test_add_during_a_pass_is_played_in_the_same_pass():
+    queue = ShuffleQueue([f"song{i}" for i in range(10)], seed=2)
+    played = drain(queue, 4)
+    queue.add("new")
+    queue.add("new")
+    played += drain(queue, queue.remaining())
+    assert sorted(played) == sorted([f"song{i}" for i in range(10)] + ["new"])
+
+
+def test_remove_during_a_pass_skips_the_key_and_keeps_the_rest():
+    keys = [f"song{i}" for i in range(10)]
+    queue = ShuffleQueue(keys, seed=4)
+    played = drain(queue, 3)
+    upcoming = queue.order[queue.cursor]
+    queue.remove(upcoming)
+    queue.remove(played[0])
+    rest = drain(queue, queue.remaining())
+    assert upcoming not in rest and played[0] not in rest
+    assert sorted(played + rest) == sorted(set(keys) - {upcoming})
+    assert len(queue) == 8
+
+
+def test_take_and_pending_track_what_has_been_played():
+    queue = ShuffleQueue(["a", "b", "c", "d"], seed=5)
+    assert queue.take("c") == "c"
+    assert queue.take("c") is None
+    assert not queue.pending("c") and queue.pending("a") and not queue.pending("zzz")
+    rest = drain(queue, 3)
+    assert sorted(rest) == ["a", "b", "d"]
+
+
+def test_peek_matches_next():
+    queue = ShuffleQueue([f"song{i}" for i in range(5)], seed=6)
+    current = None
+    for _ in range(12):
+        expected = queue.peek(current)
+        current = queue.next(current)
+        assert current == expected
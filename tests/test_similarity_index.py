@@ -0,0 +1,87 @@
+import random
+import numpy as np
+import pytest
+from SimilarityIndex import KDTree, feature_matrix, genre_vector
+from Song import Song
+from SongCatalog import SongCatalog
+
+GENRES = ["k-pop", "pop", "jazz", "hip hop", "smooth jazz", "rock", ""]
+
+
+def random_song(rng, name):
+    return Song(f"songs/{name}.mp3", name, "Artist", genre=rng.choice(GENRES),
+                duration=rng.choice([0.0, rng.uniform(60, 400)]),
+                bpm=rng.choice([0.0, rng.uniform(60, 200)]))
+
+
+def library(count=3000, seed=5):
+    rng = random.Random(seed)
+    catalog = SongCatalog()
+    for i in range(count):
+        catalog.append(random_song(rng, f"s{i}"))
+    return catalog, rng
+
+
+def vector(song):
+    return feature_matrix(np.array([song.bpm]), np.array([song.duration]), genre_vector(song.genre))[0]
+
+
+def check(catalog, rng, probes=20, k=10):
+    songs = list(catalog)
+    vectors = np.array([vector(song) for song in songs])
+    rows = {song.file_path: row for row, song in enumerate(songs)}
+    for _ in range(probes):
+        row = rng.randrange(len(songs))
+        found = catalog.similar(songs[row], k)
+        assert songs[row].file_path not in {other.file_path for other in found}
+        assert len({other.file_path for other in found}) == len(found) == k
+        distances = ((vectors - vectors[row]) ** 2).sum(axis=1)
+        distances[row] = np.inf
+        expected = np.sort(distances)[:k]
+        assert distances[[rows[other.file_path] for other in found]] == pytest.approx(expected)
+
+
+def test_kdtree_matches_brute_force():
+    rng = np.random.default_rng(1)
+    points = rng.standard_normal((2000, 8))
+    tree = KDTree(points.copy(), np.arange(2000), leaf_size=16)
+    usable = np.ones(2000, dtype=bool)
+    usable[::7] = False
+    for point in rng.standard_normal((20, 8)):
+        best = tree.query(point, 5, usable, [])
+        distances = ((points - point) ** 2).sum(axis=1)
+        distances[~usable] = np.inf
+        assert sorted(slot for _, slot in best) == sorted(np.argsort(distances)[:5].tolist())
+
+
+def test_nearest_matches_brute_force():
+    catalog, rng = library()
+    check(catalog, rng)
+
+
+def test_pending_edits_are_searched_before_rebuild():
+    catalog, rng = library()
+    catalog.similar(catalog[0], 1)
+    for i in range(40):
+        catalog.remove(catalog[rng.randrange(len(catalog))].file_path)
+        target = catalog[rng.randrange(len(catalog))]
+        catalog.replace(target.file_path, random_song(rng, target.title))
+        catalog.append(random_song(rng, f"new{i}"))
+    assert catalog.similarity_index.pending
+    check(catalog, rng)
+
+
+def test_rebuild_after_many_edits():
+    catalog, rng = library()
+    catalog.similar(catalog[0], 1)
+    for i in range(400):
+        catalog.append(random_song(rng, f"new{i}"))
+    check(catalog, rng, probes=1)
+    assert not catalog.similarity_index.pending
+    check(catalog, rng)
+
+
+def test_small_catalog_returns_everything_else():
+    catalog, _ = library(count=4)
+    found = catalog.similar(catalog[0], 10)
+    assert {song.file_path for song in found} == {song.file_path for song in list(catalog)[1:]}
@@ -0,0 +1,102 @@
+from Song import Song
+from SongCatalog import CatalogListener, SongCatalog
+from Storage import Storage
+
+
+def song(i):
+    return Song(f"songs/{i}.mp3", f"Track {i}", "Artist")
+
+
+def test_index_stays_correct_across_appends_and_removes():
+    catalog = SongCatalog()
+    for i in range(50):
+        catalog.append(song(i))
+    expected = [song(i).file_path for i in range(50)]
+    for i in (0, 17, 49, 25, 3):
+        catalog.remove(song(i).file_path)
+        expected.remove(song(i).file_path)
+        catalog.append(song(100 + i))
+        expected.append(song(100 + i).file_path)
+        for position, path in enumerate(expected):
+            assert catalog.index(path) == position
+    assert catalog.index(song(17).file_path) == -1
+    assert [s.file_path for s in catalog] == expected
+
+
+def snapshot_catalog(tmp_path, count=20, cache_size=4):
+    storage = Storage("json", str(tmp_path / "data"))
+    storage.save_songs([song(i) for i in range(count)])
+    storage.write_snapshot()
+    return SongCatalog(storage.open_snapshot(), cache_size)
+
+
+def test_overlay_serves_snapshot_rows_edits_and_appends(tmp_path):
+    catalog = snapshot_catalog(tmp_path)
+    assert catalog.reader is not None and len(catalog) == 20
+    assert catalog[3].title == "Track 3" and catalog[-1].title == "Track 19"
+
+    catalog.replace(song(3).file_path, Song(song(3).file_path, "Edited", "Someone"))
+    catalog.append(song(20))
+    catalog.remove(song(0).file_path)
+    catalog.remove(song(20).file_path)
+    catalog.append(song(21))
+
+    titles = [s.title for s in catalog]
+    assert titles == ["Track 1", "Track 2", "Edited"] + [f"Track {i}" for i in range(4, 20)] + ["Track 21"]
+    assert [s.title for s in catalog[1:4]] == titles[1:4]
+    assert catalog.get(song(3).file_path).artist == "Someone"
+    assert catalog.get(song(0).file_path) is None and song(20).file_path not in catalog
+    assert catalog.index(song(21).file_path) == 19
+    assert [s.title for s in catalog.search("edited")] == ["Edited"]
+    assert catalog.search("track 3") == []
+    assert len(catalog._cache) <= 4
+    catalog.close()
+
+
+def test_append_of_an_existing_key_replaces_in_place(tmp_path):
+    catalog = snapshot_catalog(tmp_path, count=3)
+    catalog.append(Song(song(1).file_path, "Again", "Artist"))
+    assert len(catalog) == 3 and catalog[1].title == "Again"
+    catalog.close()
+
+
+class Recorder(CatalogListener):
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.events = []
+
+    def begin_insert(self, position):
+        self.events.append(("begin_insert", position, len(self.catalog)))
+
+    def end_insert(self):
+        self.events.append(("end_insert", len(self.catalog)))
+
+    def begin_remove(self, position):
+        self.events.append(("begin_remove", position, self.catalog[position].title))
+
+    def end_remove(self):
+        self.events.append(("end_remove", len(self.catalog)))
+
+    def row_changed(self, position):
+        self.events.append(("row_changed", position, self.catalog[position].title))
+
+
+def test_listeners_see_each_change_bracketed_by_position():
+    catalog = SongCatalog()
+    recorder = Recorder(catalog)
+    catalog.add_listener(recorder)
+    catalog.append(song(0))
+    catalog.append(song(1))
+    catalog.replace(song(0).file_path, Song(song(0).file_path, "Renamed", "Artist"))
+    catalog.remove(song(0).file_path)
+    assert catalog.remove("missing.mp3") is None
+    assert not catalog.replace("missing.mp3", song(9))
+    assert recorder.events == [
+        ("begin_insert", 0, 0), ("end_insert", 1),
+        ("begin_insert", 1, 1), ("end_insert", 2),
+        ("row_changed", 0, "Renamed"),
+        ("begin_remove", 0, "Renamed"), ("end_remove", 1),
+    ]
+    catalog.remove_listener(recorder)
+    catalog.append(song(2))
+    assert len(recorder.events) == 7
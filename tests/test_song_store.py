@@ -0,0 +1,72 @@
+import os
+import pytest
+from BulkImport import BulkImporter
+from Importer import DuplicateSong, Importer
+from SongStore import SongStore, hash_file
+
+
+class OfflineServices():
+    def get_song_info(self, song_name, artist_name):
+        return {"error": "offline"}
+
+    def analyze_audio(self, file):
+        return {"error": "offline"}
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_put_stores_identical_content_once(tmp_path):
+    store = SongStore(str(tmp_path / "songs"))
+    first = write(tmp_path / "a.WAV", b"RIFF same")
+    second = write(tmp_path / "b.wav", b"RIFF same")
+    dest, copied = store.put(first)
+    assert copied and store.is_blob(dest)
+    assert os.path.basename(dest) == hash_file(first) + ".wav"
+    assert store.put(second) == (dest, False)
+    with open(dest, "rb") as f:
+        assert f.read() == b"RIFF same"
+    assert not [name for name in os.listdir(os.path.dirname(dest)) if name.endswith(".part")]
+
+
+def test_remove_drops_empty_shard_directory(tmp_path):
+    store = SongStore(str(tmp_path / "songs"))
+    dest, _ = store.put(write(tmp_path / "a.wav", b"RIFF a"))
+    store.remove(dest)
+    assert not os.path.exists(os.path.dirname(dest))
+
+
+def test_importer_rejects_content_already_in_the_library(tmp_path):
+    library = set()
+    importer = Importer(OfflineServices(), str(tmp_path / "songs"), str(tmp_path / "covers"),
+                        max_workers=1, known=library.__contains__)
+    try:
+        song = importer.import_file(write(tmp_path / "a.wav", b"RIFF a"), "A", "Artist").result()
+        library.add(song.file_path)
+        with pytest.raises(DuplicateSong) as raised:
+            importer.import_file(write(tmp_path / "copy.wav", b"RIFF a"), "Other", "Name").result()
+        assert raised.value.existing == song.file_path
+    finally:
+        importer.shutdown()
+
+
+def test_bulk_import_reports_duplicates_instead_of_importing_them(tmp_path):
+    source = tmp_path / "in"
+    source.mkdir()
+    for name, data in (("one.wav", b"RIFF 1"), ("one again.wav", b"RIFF 1"), ("two.wav", b"RIFF 2")):
+        write(source / name, data)
+    library = set()
+    bulk = BulkImporter(OfflineServices(), None, str(tmp_path / "songs"), str(tmp_path / "covers"),
+                        max_workers=2, known=library.__contains__)
+    try:
+        report = bulk.run(str(source))
+        assert len(report.imported) == 2 and len(report.duplicates) == 1 and not report.failures
+        library.update(song.file_path for song in report.imported)
+        again = bulk.run(str(source))
+        assert not again.imported and len(again.duplicates) == 3
+        assert "3 duplicates skipped" in again.summary()
+    finally:
+        bulk.shutdown()